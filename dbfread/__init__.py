@@ -17,8 +17,9 @@ __email__ = 'ombdalen@gmail.com'
 __url__ = 'https://dbfread.readthedocs.io/'
 __license__ = 'MIT'
 
-from .dbf import DBF
+from .dbf import DBF, DBFHandle
 from .deprecated_dbf import open, read
+from .many import open_many, TableResult
 from .exceptions import *
 from .field_parser import FieldParser, InvalidValue
 from .version import version_info, version as __version__
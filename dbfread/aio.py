@@ -0,0 +1,118 @@
+"""
+Read records from asyncio code.
+
+Reading and parsing records blocks, so the work is done in an
+executor, one batch of records at a time, and the batches are handed
+back to the event loop. Only one batch is read ahead, so a slow
+consumer doesn't make the reader buffer the whole table.
+
+This module uses async syntax and is only imported by DBF.aiter()
+and DBF.aload().
+"""
+import asyncio
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _read_batch(records, batch_size):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == batch_size:
+            break
+    return batch
+
+
+class AsyncRecordIterator(object):
+    """Async iterator over records.
+
+    Records are read in batches of batch_size in executor (the event
+    loop's default executor if None). Can be used as an async context
+    manager to close the underlying files when done.
+    """
+    def __init__(self, records, batch_size=DEFAULT_BATCH_SIZE,
+                 executor=None):
+        if batch_size < 1:
+            raise ValueError('batch_size must be at least 1')
+
+        self._records = records
+        self._batch_size = batch_size
+        self._executor = executor
+        self._batch = iter([])
+        self._pending = None
+        self._done = False
+
+    def _read_ahead(self):
+        loop = asyncio.get_event_loop()
+        self._pending = loop.run_in_executor(self._executor, _read_batch,
+                                             self._records, self._batch_size)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        for record in self._batch:
+            return record
+
+        if self._done:
+            raise StopAsyncIteration
+
+        if self._pending is None:
+            self._read_ahead()
+
+        # Shield the read so it is not lost (or left running while
+        # the files are closed) if the consumer is cancelled. The next
+        # call picks up the same batch.
+        batch = await asyncio.shield(self._pending)
+        self._pending = None
+
+        if len(batch) < self._batch_size:
+            self._done = True
+        else:
+            self._read_ahead()
+
+        if not batch:
+            raise StopAsyncIteration
+        self._batch = iter(batch)
+        return next(self._batch)
+
+    async def aclose(self):
+        """Stop reading and close the files."""
+        self._done = True
+        self._batch = iter([])
+        if self._pending is not None:
+            # The records can't be closed while a batch is read.
+            try:
+                await asyncio.shield(self._pending)
+            except Exception:
+                pass
+            self._pending = None
+
+        close = getattr(self._records, 'close', None)
+        if close is not None:
+            close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+async def load_async(table, batch_size=DEFAULT_BATCH_SIZE, executor=None):
+    """Load records and deleted records into memory in one pass."""
+    if table.loaded:
+        return
+
+    records = []
+    deleted = []
+    append = {b' ': records.append, b'*': deleted.append}
+    iterator = AsyncRecordIterator(table._iter_all_records(),
+                                   batch_size, executor)
+    async with iterator:
+        async for recno, flag, record in iterator:
+            append[flag](record)
+
+    if not table.loaded:
+        table._records = records
+        table._deleted = deleted
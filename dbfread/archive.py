@@ -0,0 +1,135 @@
+"""
+Reading tables from ZIP archives.
+
+The archive is opened once and kept open by the DBF object, so each
+iteration only has to open the member. Members in a ZIP file are
+compressed, and seeking in them means decompressing from the start of
+the member again. With the spill option each member is decompressed
+once, into memory or into a temporary file, and all reads are then
+done from there.
+
+Members can only seek in Python 3.7 and later. In older versions
+members are always spilled, into memory unless spill is 'tempfile'.
+"""
+import io
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+from contextlib import closing
+from .mmapfile import open_mapped
+
+SPILL_MODES = [None, 'memory', 'tempfile']
+
+
+class ZipArchive(object):
+    """A ZIP archive holding DBF and memo files."""
+    def __init__(self, filename, spill=None):
+        if spill not in SPILL_MODES:
+            raise ValueError("spill must be None, 'memory' or 'tempfile'"
+                             " (was {!r})".format(spill))
+
+        self.filename = filename
+        self.spill = spill
+        self._spilled = {}
+        self._lock = threading.Lock()
+        self.zipfile = zipfile.ZipFile(filename)
+
+        # Lowercase name to member name.
+        self._names = {}
+        for name in self.zipfile.namelist():
+            self._names.setdefault(name.lower(), name)
+
+    def namelist(self):
+        return self.zipfile.namelist()
+
+    def find(self, name, ignorecase=True):
+        """Return the member name or None if it's not in the archive."""
+        if ignorecase:
+            return self._names.get(name.lower())
+        elif name in self.zipfile.namelist():
+            return name
+        else:
+            return None
+
+    def find_tables(self):
+        """Return the names of all DBF files in the archive."""
+        return [name for name in self.zipfile.namelist()
+                if name.lower().endswith('.dbf')]
+
+    def find_memofile(self, member):
+        """Return the name of the memo file for a DBF member or None."""
+        stem = os.path.splitext(member)[0]
+        for ext in ['.fpt', '.dbt']:
+            name = self.find(stem + ext)
+            if name is not None:
+                return name
+        return None
+
+    def getsize(self, name):
+        return self.zipfile.getinfo(name).file_size
+
+    def open(self, name, use_mmap=False):
+        """Open a member for reading.
+
+        If use_mmap is True and the member is spilled to a temporary
+        file the file is memory mapped.
+        """
+        spill = self.spill
+        if spill is None:
+            member = self.zipfile.open(name)
+            if member.seekable():
+                return member
+            member.close()
+            spill = 'memory'
+
+        spilled = self._spill(name, spill)
+        if spill == 'memory':
+            # BytesIO shares the data until it is written to.
+            return io.BytesIO(spilled)
+        elif use_mmap:
+            return open_mapped(spilled)
+        else:
+            return open(spilled, 'rb')
+
+    def _spill(self, name, spill):
+        with self._lock:
+            if name not in self._spilled:
+                with self.zipfile.open(name) as member:
+                    if spill == 'memory':
+                        self._spilled[name] = member.read()
+                    else:
+                        suffix = os.path.splitext(name)[1]
+                        fd, path = tempfile.mkstemp(prefix='dbfread-',
+                                                    suffix=suffix)
+                        with closing(os.fdopen(fd, 'wb')) as outfile:
+                            shutil.copyfileobj(member, outfile)
+                        self._spilled[name] = path
+            return self._spilled[name]
+
+    def close(self):
+        """Close the archive and remove temporary files."""
+        with self._lock:
+            if self.spill == 'tempfile':
+                for path in self._spilled.values():
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+            self._spilled = {}
+            self.zipfile.close()
+
+    def __del__(self):
+        if getattr(self, '_spilled', None):
+            self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+        return False
+
+    def __repr__(self):
+        return '<ZipArchive {!r}>'.format(self.filename)
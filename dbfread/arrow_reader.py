@@ -0,0 +1,229 @@
+"""
+Read DBF tables as Apache Arrow record batches.
+
+Columns are read in chunks with dbfread.numpy_reader and converted to
+Arrow arrays with a schema derived from the field headers, so a table
+can be streamed to Parquet or Feather without holding all of it in
+memory.
+
+This module requires PyArrow. It is only imported by the Arrow
+methods of DBF.
+"""
+import numpy as np
+import pyarrow as pa
+from .numpy_reader import iter_numpy, get_column_names
+
+DEFAULT_BATCH_SIZE = 65536
+
+# Currency fields are stored as 64 bit integers in ten thousandths.
+CURRENCY_TYPE = pa.decimal128(19, 4)
+
+
+def _is_vfp(table):
+    return table.header.dbversion in [0x30, 0x31, 0x32]
+
+
+def get_arrow_type(table, field, dictionary=()):
+    """Return the Arrow type for a field.
+
+    Returns None for field types that are not known, in which case the
+    type is inferred from the values.
+    """
+    ftype = field.type
+
+    if table.raw:
+        return pa.binary()
+    elif ftype in 'CVM':
+        if field.name in dictionary:
+            return pa.dictionary(pa.int32(), pa.string())
+        else:
+            return pa.string()
+    elif ftype in 'GP0':
+        return pa.binary()
+    elif ftype == 'B':
+        if _is_vfp(table):
+            return pa.float64()
+        else:
+            return pa.binary()
+    elif ftype == 'N':
+        if field.decimal_count == 0:
+            return pa.int64()
+        else:
+            return pa.float64()
+    elif ftype in 'FO':
+        return pa.float64()
+    elif ftype in 'I+':
+        return pa.int32()
+    elif ftype == 'D':
+        return pa.date32()
+    elif ftype in 'T@':
+        return pa.timestamp('ms')
+    elif ftype == 'Y':
+        return CURRENCY_TYPE
+    elif ftype == 'L':
+        return pa.bool_()
+    else:
+        return None
+
+
+def _currency_array(values):
+    # Decimal128 values are 128 bit little endian integers holding the
+    # unscaled value, so sign extend each int64 to two int64 words.
+    values = values.astype('<i8')
+    words = np.empty((len(values), 2), dtype='<i8')
+    words[:, 0] = values
+    words[:, 1] = values >> 63
+    return pa.Array.from_buffers(CURRENCY_TYPE, len(values),
+                                 [None, pa.py_buffer(words.tobytes())])
+
+
+def _is_integral(array):
+    """Return True if all the floats in array (ignoring nan) can be
+    stored as int64."""
+    values = array[~np.isnan(array)]
+    return bool(np.all(np.isfinite(values)
+                       & (values == np.trunc(values))
+                       & (np.abs(values) < 2.0**63)))
+
+
+def _make_array(array, arrow_type):
+    if arrow_type == CURRENCY_TYPE and array.dtype != object:
+        return _currency_array(array)
+
+    if isinstance(array, np.ma.MaskedArray):
+        array = pa.array(np.ma.getdata(array),
+                         mask=np.ma.getmaskarray(array))
+    elif array.dtype.kind == 'f' and pa.types.is_integer(arrow_type):
+        # Integers with empty values come back as floats with nan.
+        # N fields without decimals can still hold values like 1.5,
+        # which are kept as floats.
+        if not _is_integral(array):
+            return pa.array(array, from_pandas=True)
+        array = pa.array(array, from_pandas=True)
+    elif array.dtype.kind in 'Mm':
+        # NaT becomes null.
+        array = pa.array(array, mask=np.isnat(array))
+    else:
+        array = pa.array(array, from_pandas=True)
+
+    if arrow_type is None or array.type == arrow_type:
+        return array
+    elif pa.types.is_dictionary(arrow_type):
+        return array.cast(arrow_type.value_type).dictionary_encode()
+    else:
+        return array.cast(arrow_type)
+
+
+def iter_arrow_batches(table, batch_size=DEFAULT_BATCH_SIZE, columns=None,
+                       dictionary=None):
+    """Read live records as Arrow record batches.
+
+    Yields one batch for every batch_size records in the file. Batches
+    with no live records are skipped, but at least one batch is
+    always returned. All batches have the same schema.
+    """
+    columns = get_column_names(table, columns)
+    if dictionary is None:
+        dictionary = ()
+    fields = dict((field.name, field) for field in table.fields)
+
+    types = dict((name, get_arrow_type(table, fields[name], dictionary))
+                 for name in columns)
+
+    schema = None
+    empty = None
+    yielded = False
+    for arrays in iter_numpy(table, columns, batch_size):
+        arrow_arrays = [_make_array(arrays[name], types[name])
+                        for name in columns]
+
+        if schema is None:
+            # Types not known from the field headers are taken from
+            # the first batch, and so are floats in integer fields.
+            for name, array in zip(columns, arrow_arrays):
+                if types[name] is None or pa.types.is_floating(array.type):
+                    types[name] = array.type
+            schema = pa.schema([(name, types[name]) for name in columns])
+        else:
+            for name, array in zip(columns, arrow_arrays):
+                if (pa.types.is_integer(types[name])
+                        and pa.types.is_floating(array.type)):
+                    raise ValueError(
+                        'field {!r} has non-integer values after the first'
+                        ' batch. Use a larger batch_size.'.format(name))
+
+        batch = pa.RecordBatch.from_arrays(arrow_arrays, schema=schema)
+        if batch.num_rows:
+            yield batch
+            yielded = True
+        elif empty is None:
+            empty = batch
+
+    if not yielded:
+        # No live records.
+        yield empty
+
+
+def _iter_batches_and_schema(table, batch_size, columns, dictionary):
+    # The writers need the schema up front, which is only known when
+    # the first batch has been read.
+    batches = iter_arrow_batches(table, batch_size, columns, dictionary)
+    first = next(batches)
+    yield first.schema
+
+    yield first
+    for batch in batches:
+        yield batch
+
+
+def _unify_dictionaries(batches):
+    # Arrow IPC files can't replace a dictionary between batches, only
+    # extend it. Re-encode each batch against one growing dictionary
+    # per column, so the writer can emit the new values as deltas.
+    dictionaries = {}
+    for batch in batches:
+        arrays = []
+        for i, array in enumerate(batch.columns):
+            if pa.types.is_dictionary(array.type):
+                codes, values = dictionaries.setdefault(i, ({}, []))
+                remap = []
+                for value in array.dictionary.to_pylist():
+                    if value not in codes:
+                        codes[value] = len(values)
+                        values.append(value)
+                    remap.append(codes[value])
+                indices = pa.array(remap, array.type.index_type).take(
+                    array.indices)
+                array = pa.DictionaryArray.from_arrays(
+                    indices, pa.array(values, array.type.value_type))
+            arrays.append(array)
+        yield pa.RecordBatch.from_arrays(arrays, schema=batch.schema)
+
+
+def write_parquet(table, path, batch_size=DEFAULT_BATCH_SIZE, columns=None,
+                  dictionary=None, **kwargs):
+    """Write live records to a Parquet file one batch at a time.
+
+    Extra keyword arguments are passed to pyarrow.parquet.ParquetWriter.
+    """
+    import pyarrow.parquet as pq
+
+    batches = _iter_batches_and_schema(table, batch_size, columns, dictionary)
+    schema = next(batches)
+    with pq.ParquetWriter(path, schema, **kwargs) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+
+def write_feather(table, path, batch_size=DEFAULT_BATCH_SIZE, columns=None,
+                  dictionary=None, compression=None):
+    """Write live records to a Feather (Arrow IPC) file one batch at a
+    time."""
+    batches = _iter_batches_and_schema(table, batch_size, columns, dictionary)
+    schema = next(batches)
+    options = pa.ipc.IpcWriteOptions(compression=compression,
+                                     emit_dictionary_deltas=True)
+    with pa.OSFile(path, 'wb') as sink:
+        with pa.ipc.new_file(sink, schema, options=options) as writer:
+            for batch in _unify_dictionaries(batches):
+                writer.write_batch(batch)
@@ -0,0 +1,310 @@
+"""
+Column oriented storage for loaded records.
+
+table.load(storage='columnar') keeps each field in one compact column
+instead of keeping a dictionary for every record:
+
+  I, +, N (no decimals)   array of 64 bit integers
+  F, O, N, B (FoxPro)     array of doubles
+  D                       array of date ordinals
+  T, @                    array of microseconds since 0001-01-01
+  C, V, L, Y, 0           dictionary encoded: each distinct value is
+                          stored once and records store an 8, 16 or
+                          32 bit code
+  others (memos)          list of values
+
+Empty values (None) are kept in a separate byte array of null flags
+which is only made if the column has any. If a value doesn't fit the
+column (for example an int in a float column, or a value returned by
+a custom field parser) the column is turned into a plain list, so
+values always come back exactly as the field parser returned them.
+
+Records are returned as Row objects, which are read-only views of one
+record in the columns. Rows work like dictionaries and compare equal
+to the records load() would otherwise return.
+"""
+import datetime
+import collections
+from array import array
+
+try:
+    array('q')
+    INT_TYPECODE = 'q'
+except ValueError:
+    # Python 2 has no 'q'.
+    INT_TYPECODE = 'l'
+
+if array('I').itemsize >= 4:
+    _CODE32_TYPECODE = 'I'
+else:
+    _CODE32_TYPECODE = 'L'
+
+STORAGE_TYPES = ['list', 'columnar']
+
+_MICROSECONDS_PER_DAY = 86400 * 10**6
+
+
+def _encode_datetime(value):
+    if value.tzinfo is not None:
+        raise ValueError('can only store naive datetimes')
+    seconds = value.hour * 3600 + value.minute * 60 + value.second
+    return ((value.toordinal() * 86400 + seconds) * 10**6
+            + value.microsecond)
+
+
+def _decode_datetime(value):
+    days, microseconds = divmod(value, _MICROSECONDS_PER_DAY)
+    return (datetime.datetime.fromordinal(days)
+            + datetime.timedelta(microseconds=microseconds))
+
+
+class ArrayColumn(object):
+    """A column of values of one type stored in an array.
+
+    Values are converted with encode() when they are added and
+    decode() when they are read back.
+    """
+    def __init__(self, typecode, type, encode=None, decode=None):
+        self.values = array(typecode)
+        self.nulls = None
+        self.type = type
+        self.encode = encode
+        self.decode = decode
+
+    def append(self, value):
+        if value is None:
+            if self.nulls is None:
+                self.nulls = bytearray(len(self.values))
+            self.values.append(0)
+            self.nulls.append(1)
+            return
+
+        if type(value) is not self.type:
+            raise TypeError('expected {}, got {!r}'.format(
+                self.type.__name__, value))
+        if self.encode is not None:
+            value = self.encode(value)
+        self.values.append(value)
+        if self.nulls is not None:
+            self.nulls.append(0)
+
+    def __getitem__(self, index):
+        if self.nulls is not None and self.nulls[index]:
+            return None
+        value = self.values[index]
+        if self.decode is None:
+            return value
+        else:
+            return self.decode(value)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        for i in range(len(self.values)):
+            yield self[i]
+
+
+class DictColumn(object):
+    """A dictionary encoded column.
+
+    Each distinct value is stored once in values and the records are
+    stored as indexes into it in codes. The codes start out as bytes
+    and are widened when there are more than 256 or 65536 distinct
+    values.
+    """
+    def __init__(self):
+        self.values = []
+        self.codes = array('B')
+        self._lookup = {}
+
+    def append(self, value):
+        try:
+            code = self._lookup[value]
+        except KeyError:
+            code = len(self.values)
+            if code == 256:
+                self.codes = array('H', self.codes)
+            elif code == 65536:
+                self.codes = array(_CODE32_TYPECODE, self.codes)
+            self._lookup[value] = code
+            self.values.append(value)
+        else:
+            # Values of different types can be equal (1 == 1.0 == True)
+            # but we must return the exact value.
+            if type(self.values[code]) is not type(value):
+                raise TypeError('mixed value types in column')
+        self.codes.append(code)
+
+    def freeze(self):
+        """Drop the lookup table. No more values can be added."""
+        self._lookup = None
+
+    def __getitem__(self, index):
+        return self.values[self.codes[index]]
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __iter__(self):
+        values = self.values
+        for code in self.codes:
+            yield values[code]
+
+
+def make_column(field, dbversion):
+    """Return an empty column for the values of a field."""
+    type = field.type
+    if type in 'I+' or (type == 'N' and field.decimal_count == 0):
+        return ArrayColumn(INT_TYPECODE, int)
+    elif (type in 'FON' or (type == 'B'
+                            and dbversion in [0x30, 0x31, 0x32])):
+        return ArrayColumn('d', float)
+    elif type == 'D':
+        return ArrayColumn('i', datetime.date,
+                           datetime.date.toordinal,
+                           datetime.date.fromordinal)
+    elif type in 'T@':
+        return ArrayColumn(INT_TYPECODE, datetime.datetime,
+                           _encode_datetime, _decode_datetime)
+    elif type in 'CVLY0':
+        return DictColumn()
+    else:
+        return []
+
+
+class Row(object):
+    """A read-only view of one record in a ColumnarRecords object."""
+    __slots__ = ['_records', '_index']
+
+    def __init__(self, records, index):
+        self._records = records
+        self._index = index
+
+    def __getitem__(self, key):
+        records = self._records
+        try:
+            column = records._columns[records._positions[key]]
+        except (KeyError, TypeError):
+            raise KeyError(key)
+        return column[self._index]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return key in self._records._positions
+
+    def __len__(self):
+        return len(self._records.names)
+
+    def __iter__(self):
+        return iter(self._records.names)
+
+    def keys(self):
+        return list(self._records.names)
+
+    def values(self):
+        index = self._index
+        return [column[index] for column in self._records._columns]
+
+    def items(self):
+        return list(zip(self._records.names, self.values()))
+
+    def _asdict(self):
+        return collections.OrderedDict(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, Row):
+            return self.items() == other.items()
+        elif isinstance(other, dict):
+            return dict(self.items()) == other
+        else:
+            return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = None
+
+    def __reduce__(self):
+        # Don't drag the whole table along.
+        return (collections.OrderedDict, (self.items(),))
+
+    def __repr__(self):
+        return 'Row({})'.format(', '.join(
+            '{}={!r}'.format(name, value) for name, value in self.items()))
+
+
+class ColumnarRecords(object):
+    """A sequence of records stored in columns.
+
+    Indexing and iteration return Row objects. Slices return lists
+    of rows like they do for lists of records.
+    """
+    def __init__(self, fields, dbversion):
+        self.names = [field.name for field in fields]
+        self._positions = dict((name, i) for i, name in enumerate(self.names))
+        self._columns = [make_column(field, dbversion) for field in fields]
+        self._length = 0
+
+    def append(self, values):
+        """Add a record given as a tuple of values in field order."""
+        columns = self._columns
+        for i, value in enumerate(values):
+            try:
+                columns[i].append(value)
+            except (TypeError, ValueError, OverflowError):
+                columns[i] = list(columns[i])
+                columns[i].append(value)
+        self._length += 1
+
+    def freeze(self):
+        """Called when all records have been added."""
+        for column in self._columns:
+            if isinstance(column, DictColumn):
+                column.freeze()
+
+    def column(self, name):
+        """Return the values of a field as a sequence."""
+        return self._columns[self._positions[name]]
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [Row(self, i) for i in range(*index.indices(self._length))]
+
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError('record index out of range')
+        return Row(self, index)
+
+    def __iter__(self):
+        for i in range(self._length):
+            yield Row(self, i)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, ColumnarRecords)):
+            return len(self) == len(other) and list(self) == list(other)
+        else:
+            return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '<ColumnarRecords of {} records>'.format(self._length)
@@ -0,0 +1,7 @@
+import sys
+
+# These modules use async/await syntax, which can't even be compiled
+# by older versions of Python.
+collect_ignore = []
+if sys.version_info < (3, 5):
+    collect_ignore.append('test_aio.py')
@@ -3,18 +3,37 @@ Class to read DBF files.
 """
 import os
 import sys
-import io
 import datetime
+import copy
+import functools
+import threading
 import collections
+from contextlib import closing
 
 from .ifiles import ifind
 from .struct_parser import StructParser
 from .field_parser import FieldParser
-from .memo import find_memofile, open_memofile, FakeMemoFile, BinaryMemo
+from .decoder import make_record_decoder
+from .records import RECORD_TYPES, make_record_class
+from .columnar import STORAGE_TYPES, ColumnarRecords
+from .predicates import make_predicate, combine_predicates
+from .memo import (find_memofile, open_memofile, FakeMemoFile, BinaryMemo,
+                   MemoCache, BINARY_MEMO_TYPES)
+from .mmapfile import open_mapped, is_mapped, BufferFile
+from .archive import ZipArchive
+from .streams import (ForwardReader, OffsetFile, is_seekable,
+                      get_compression, strip_compression, open_compressed,
+                      find_compressed_memofile, open_memo_data)
 from .codepages import guess_encoding
 from .dbversions import get_dbversion_string
 from .exceptions import *
 
+# Records are read from disk in blocks of about this many bytes.
+DEFAULT_BUFFER_SIZE = 4 * 1024 * 1024
+
+# Memos are prefetched for this many records at a time.
+MEMO_PREFETCH_RECORDS = 256
+
 DBFHeader = StructParser(
     'DBFHeader',
     '<BBBBLHHHBBLLLBBH',
@@ -63,6 +82,11 @@ def expand_year(year):
         return 1900 + year
 
 
+def _return_items(items):
+    # recfactory=None. (A named function so tables can be pickled.)
+    return items
+
+
 class RecordIterator(object):
     def __init__(self, table, record_type):
         self._record_type = record_type
@@ -74,6 +98,153 @@ class RecordIterator(object):
     def __len__(self):
         return self._table._count_records(self._record_type)
 
+    def __getitem__(self, index):
+        """Get record by index or a list of records by slice.
+
+        Indexes are positions in the file, which include both live
+        and deleted records. (See ``DBF.get_record()``.) Records with
+        the wrong deletion flag are left out of slices and raise
+        IndexError for a single index.
+        """
+        return self._table._get_records(index, self._record_type)
+
+    def iter_recno(self):
+        """Iterate over ``(recno, record)`` tuples.
+
+        recno is the FoxPro ``RECNO()`` of the record, which is its
+        index in the file plus 1.
+        """
+        return self._table._iter_records(self._record_type, recno=True)
+
+
+# DBF attributes that are not carried over by DBFHandle.
+_HANDLE_EXCLUDE = ['_archive', '_owns_archive', 'header', 'fields',
+                   '_records', '_deleted', '_lazy_memofile',
+                   '_lazy_memofile_key', '_lazy_memo_lock',
+                   '_record_counts', '_record_counts_key', 'memo_cache',
+                   '_memo_index', '_memo_index_key']
+
+
+def _make_memo_cache(size):
+    if size:
+        return MemoCache(size)
+    else:
+        return None
+
+
+def _open_buffer(view, use_mmap=False):
+    return BufferFile(view)
+
+
+class DBFHandle(object):
+    """A picklable description of an open table.
+
+    Holds the parsed headers, field list, encoding, memo file name and
+    options of a DBF object, so the table can be sent to another
+    process and opened there with ``open()`` without reading the
+    headers again. A handle can also describe a range of records
+    (by index) for one worker to read.
+    """
+    def __init__(self, table, start=0, stop=None):
+        self.cls = type(table)
+        self.start = start
+        self.stop = stop
+        self.numrecords = table._get_numrecords()
+
+        self._state = dict((name, value) for (name, value)
+                           in vars(table).items()
+                           if name not in _HANDLE_EXCLUDE)
+        self._header = vars(table.header).copy()
+        self._fields = [vars(field).copy() for field in table.fields]
+
+    @property
+    def filename(self):
+        return self._state['filename']
+
+    @property
+    def memofilename(self):
+        return self._state['memofilename']
+
+    def open(self):
+        """Return a new DBF object for the table."""
+        table = self.cls.__new__(self.cls)
+        vars(table).update(self._state)
+
+        table.header = DBFHeader.Class(**self._header)
+        table.fields = [DBFField.Class(**field) for field in self._fields]
+        table._records = None
+        table._deleted = None
+        table._record_counts = None
+        table._record_counts_key = None
+        table.memo_cache = _make_memo_cache(table.memo_cache_size)
+        table._memo_index = None
+        table._memo_index_key = None
+        table._init_lazy_memofile()
+
+        if table.member is None:
+            table._archive = None
+        else:
+            table._archive = ZipArchive(table.filename, table.spill)
+        table._owns_archive = table._archive is not None
+
+        return table
+
+    def split(self, chunksize):
+        """Split the handle's records into handles for ranges of
+        chunksize records.
+
+        The last range ends where this handle ends, so if stop is None
+        it reads to the end of the file.
+        """
+        if self.stop is None:
+            stop = self.numrecords
+        else:
+            stop = self.stop
+
+        handles = []
+        for start in range(self.start, max(stop, self.start + 1), chunksize):
+            handle = copy.copy(self)
+            handle.start = start
+            handle.stop = start + chunksize
+            handles.append(handle)
+
+        handles[-1].stop = self.stop
+        return handles
+
+    def iter_records(self, deleted=False):
+        """Open the table and iterate over the records in the range.
+
+        Deleted records are returned instead if deleted is True.
+        """
+        if deleted:
+            record_type = b'*'
+        else:
+            record_type = b' '
+
+        table = self.open()
+        try:
+            for record in table._iter_records(record_type,
+                                              self.start, self.stop):
+                yield record
+        finally:
+            # Pool workers may exit without running __del__(), which
+            # would leave spilled archive members behind.
+            table.close()
+
+    def __repr__(self):
+        return '<DBFHandle {!r} records {}:{}>'.format(
+            self.filename, self.start, '' if self.stop is None else self.stop)
+
+
+def _find_flags(flags, flag):
+    """Return the positions of a deletion flag in a string of flags."""
+    indexes = []
+    i = flags.find(flag)
+    while i != -1:
+        indexes.append(i)
+        i = flags.find(flag, i + 1)
+    return indexes
+
 
 class DBF(object):
     """DBF table."""
@@ -84,7 +255,17 @@ class DBF(object):
                  load=False,
                  raw=False,
                  ignore_missing_memofile=False,
-                 char_decode_errors='strict'):
+                 char_decode_errors='strict',
+                 buffer_size=DEFAULT_BUFFER_SIZE,
+                 mmap=False,
+                 columns=None,
+                 memofilename=None,
+                 memo_cache_size=None,
+                 lazy_memos=False,
+                 memo_index=False,
+                 binary_memos='bytes',
+                 member=None,
+                 spill=None):
 
         self.encoding = encoding
         self.ignorecase = ignorecase
@@ -93,50 +274,105 @@ class DBF(object):
         self.raw = raw
         self.ignore_missing_memofile = ignore_missing_memofile
         self.char_decode_errors = char_decode_errors
+        self.buffer_size = buffer_size
+        self.mmap = mmap
+        self.columns = columns
+        self._memofilename_arg = memofilename
+        self.memo_cache_size = memo_cache_size
+        self.memo_cache = _make_memo_cache(memo_cache_size)
+        self.lazy_memos = lazy_memos
+        self.memo_index = memo_index
+        if binary_memos not in BINARY_MEMO_TYPES:
+            raise ValueError('binary_memos must be one of {}'
+                             ' (was {!r})'.format(', '.join(BINARY_MEMO_TYPES),
+                                                  binary_memos))
+        self.binary_memos = binary_memos
+        self._memo_index = None
+        self._memo_index_key = None
+        self._init_lazy_memofile()
 
-        
-        try:
-            zfile = None
-            if filename.endswith(".zip"):
-                from zipfile import ZipFile
-                zfile = ZipFile(filename)
-                self.io = zfile
-                self.fname = zfile.namelist()[-1]
-                self.mode = "r"
-            else:
-                self.io = io
-                self.fname = filename
-                self.mode = "rb"
-                
-            if recfactory is None:
-                self.recfactory = lambda items: items
-            else:
-                self.recfactory = recfactory
-    
-            # Name part before .dbf is the table name
-            self.name = os.path.basename(filename)
-            self.name = os.path.splitext(self.name)[0].lower()
-            self._records = None
-            self._deleted = None
-    
-            if ignorecase:
-                self.filename = ifind(filename)
-                if not self.filename:
-                    raise DBFNotFound('could not find file {!r}'.format(filename))
+        self.member = member
+        self.spill = spill
+        self._archive = None
+        self._owns_archive = False
+
+        if recfactory is None:
+            self.recfactory = _return_items
+        elif (isinstance(recfactory, str)
+              and recfactory not in RECORD_TYPES):
+            raise ValueError('recfactory must be a function or one of'
+                             ' {} (was {!r})'.format(', '.join(RECORD_TYPES),
+                                                     recfactory))
+        else:
+            self.recfactory = recfactory
+
+        self._records = None
+        self._deleted = None
+        self._record_counts = None
+        self._record_counts_key = None
+        self._filters = []
+
+        self._stream = None
+        self._stream_read = False
+        self._fileobj = None
+        self._fileobj_offset = 0
+        self._buffer = None
+        self._memo_buffer = None
+        self.compression = None
+
+        if isinstance(memofilename, BufferFile):
+            # Set by from_buffer().
+            self._memo_buffer = memofilename.view
+            self._memofilename_arg = None
+
+        if isinstance(filename, BufferFile):
+            # Set by from_buffer().
+            self._buffer = filename.view
+            filename = self.filename = None
+        elif hasattr(filename, 'read'):
+            # File object. Use its name (if any) to find the memo file.
+            if is_seekable(filename):
+                self._fileobj = filename
+                self._fileobj_offset = filename.tell()
             else:
-                self.filename = filename
-    
-            # Filled in by self._read_headers()
-            self.memofilename = None
-            self.header = None
-            self.fields = []       # namedtuples
-            self.field_names = []  # strings
+                self._stream = ForwardReader(filename, close=False)
+            filename = getattr(filename, 'name', None)
+            if not isinstance(filename, str) or not os.path.exists(filename):
+                filename = None
+            self.filename = filename
+        elif ignorecase:
+            self.filename = ifind(filename)
+            if not self.filename:
+                raise DBFNotFound('could not find file {!r}'.format(filename))
+        else:
+            self.filename = filename
+
+        if self.filename is not None:
+            self.compression = get_compression(self.filename)
+
+        if self.filename and self.filename.lower().endswith('.zip'):
+            self._open_archive()
+        elif member is not None:
+            raise ValueError('member can only be used with ZIP files')
 
-            with self.io.open(self.fname, mode = self.mode) as infile:
+        # Name part before .dbf is the table name
+        self.name = os.path.basename(self.member or
+                                     strip_compression(filename or ''))
+        self.name = os.path.splitext(self.name)[0].lower()
+
+        # Filled in by self._read_headers()
+        self.memofilename = None
+        self.header = None
+        self.fields = []       # namedtuples
+        self.field_names = []  # strings
+
+        try:
+            with self._open() as infile:
                 self._read_header(infile)
                 self._read_field_headers(infile)
+                self._check_columns()
                 self._check_headers()
-                
+
                 try:
                     self.date = datetime.date(expand_year(self.header.year),
                                               self.header.month,
@@ -144,27 +380,97 @@ class DBF(object):
                 except ValueError:
                     # Invalid date or '\x00\x00\x00'.
                     self.date = None
-     
+
             self.memofilename = self._get_memofilename()
-    
+
             if load:
                 self.load()
-        finally:
-            if zfile is not None:
-                zfile.close()
-        
+        except Exception:
+            self.close()
+            raise
+
+    def _open_archive(self):
+        self._archive = ZipArchive(self.filename, self.spill)
+        self._owns_archive = True
+
+        if self.member is None:
+            tables = self._archive.find_tables()
+            if len(tables) == 1:
+                self.member = tables[0]
+            elif tables:
+                self._archive.close()
+                raise ValueError('{} has more than one table ({}).'
+                                 ' Choose one with member.'.format(
+                                     self.filename, ', '.join(tables)))
+            else:
+                self._archive.close()
+                raise DBFNotFound('no DBF file in {!r}'.format(self.filename))
+        else:
+            name = self._archive.find(self.member, self.ignorecase)
+            if name is None:
+                self._archive.close()
+                raise DBFNotFound('could not find {!r} in {!r}'.format(
+                    self.member, self.filename))
+            self.member = name
+
+    @classmethod
+    def from_buffer(cls, data, memo=None, **kwargs):
+        """Read a table from a buffer instead of a file.
+
+        data and memo (the memo file, if any) can be any object that
+        supports the buffer protocol, for example bytes, bytearray,
+        memoryview or the buffer of a BytesIO object
+        (``infile.getbuffer()``). The buffers are not copied and must
+        not be changed while the table is in use. Other keyword
+        arguments are passed to DBF.
+        """
+        if memo is not None:
+            memo = BufferFile(memo)
+        return cls(BufferFile(data), memofilename=memo, **kwargs)
+
+    def close(self):
+        """Close the ZIP archive the table is read from.
+
+        Does nothing for tables that are not in an archive, or for
+        copies made with select() and where(), which share the
+        archive of the table they were made from.
+        """
+        self._close_lazy_memofile()
+        if self._owns_archive:
+            self._archive.close()
+
     @property
     def dbversion(self):
         return get_dbversion_string(self.header.dbversion)
 
     def _get_memofilename(self):
-        # Does the table have a memo field?
-        field_types = [field.type for field in self.fields]
+        # Does the table have a memo field? Fields that are not
+        # selected with columns don't count.
+        field_types = [field.type for field in self._get_fields()]
         if not set(field_types) & set('MGPB'):
             # No memo fields.
             return None
 
-        path = find_memofile(self.filename)
+        if self._memo_buffer is not None:
+            # The name tells open_memofile() which type of memo file
+            # to read.
+            if self.header.dbversion in [0x83, 0x8b, 0x8e]:
+                return '<buffer>.dbt'
+            else:
+                return '<buffer>.fpt'
+        elif self._memofilename_arg is not None:
+            path = self._memofilename_arg
+            if self._archive is not None:
+                path = self._archive.find(path, self.ignorecase)
+        elif self._archive is not None:
+            path = self._archive.find_memofile(self.member)
+        elif self.compression is not None:
+            path = find_compressed_memofile(self.filename)
+        elif self.filename is None:
+            path = None
+        else:
+            path = find_memofile(self.filename)
+
         if path is None:
             if self.ignore_missing_memofile:
                 return None
@@ -179,16 +485,89 @@ class DBF(object):
         """``True`` if records are loaded into memory."""
         return self._records is not None
 
-    def load(self):
+    @property
+    def storage(self):
+        """How loaded records are stored, ``'list'`` or ``'columnar'``.
+
+        ``None`` if records are not loaded.
+        """
+        if not self.loaded:
+            return None
+        elif isinstance(self._records, ColumnarRecords):
+            return 'columnar'
+        else:
+            return 'list'
+
+    def load(self, storage='list'):
         """Load records into memory.
 
         This loads both records and deleted records. The ``records``
-        and ``deleted`` attributes will now be lists of records.
+        and ``deleted`` attributes will now be lists of records, or
+        ``ColumnarRecords`` if storage is ``'columnar'``.
 
         """
-        if not self.loaded:
-            self._records = list(self._iter_records(b' '))
-            self._deleted = list(self._iter_records(b'*'))
+        if storage not in STORAGE_TYPES:
+            raise ValueError('storage must be one of {} (was {!r})'.format(
+                ', '.join(STORAGE_TYPES), storage))
+
+        if self.loaded:
+            return
+
+        if storage == 'columnar':
+            fields = self._get_fields()
+            records = ColumnarRecords(fields, self.header.dbversion)
+            deleted = ColumnarRecords(fields, self.header.dbversion)
+            self._load_records(records, deleted, 'tuple')
+            records.freeze()
+            deleted.freeze()
+            self._records, self._deleted = records, deleted
+        else:
+            self._records, self._deleted = self._load_records()
+
+    def _load_records(self, records=None, deleted=None, recfactory=None):
+        """Read live and deleted records in one pass over the file.
+
+        Records are appended to records and deleted (new lists if
+        None). recfactory overrides the table's recfactory.
+
+        Returns ``(records, deleted)``.
+        """
+        if records is None:
+            records = []
+        if deleted is None:
+            deleted = []
+        append = {b' ': records.append, b'*': deleted.append}
+        for recno, flag, record in self._iter_all_records(
+                recfactory=recfactory):
+            append[flag](record)
+        return records, deleted
+
+    def aiter(self, batch_size=1000, deleted=False, executor=None):
+        """Return an async iterator over records.
+
+        Records are read and parsed in executor (the event loop's
+        default executor if None), batch_size records at a time, so
+        the event loop is not blocked. Only one batch is read ahead.
+        If deleted is True deleted records are returned instead.
+        """
+        from .aio import AsyncRecordIterator
+
+        if self.loaded:
+            records = iter(self._deleted if deleted else self._records)
+        else:
+            records = self._iter_records(b'*' if deleted else b' ')
+        return AsyncRecordIterator(records, batch_size, executor)
+
+    def aload(self, batch_size=1000, executor=None):
+        """Load records into memory without blocking the event loop.
+
+        Works like load() but returns a coroutine which reads the
+        records batch_size at a time in executor::
+
+            await table.aload()
+        """
+        from .aio import load_async
+        return load_async(self, batch_size, executor)
 
     def unload(self):
         """Unload records from memory.
@@ -258,17 +637,140 @@ class DBF(object):
 
             self.fields.append(field)
 
-    def _open_memofile(self):
+    @property
+    def seekable(self):
+        """``False`` if the table is read from a compressed file or a
+        file object, which can only be read from start to end."""
+        return self._stream is None and self.compression is None
+
+    def _check_seekable(self, operation):
+        if not self.seekable:
+            raise NotSeekable(
+                '{} needs a seekable file, but {} can only be read from'
+                ' start to end. Iterate over the records or use'
+                ' load() instead.'.format(
+                    operation, repr(self.filename) if self.filename
+                    else 'the file object'))
+
+    def _open(self):
+        """Open the DBF file for reading records."""
+        if self._buffer is not None:
+            return BufferFile(self._buffer)
+        elif self._stream is not None:
+            if self.header is not None:
+                # The headers have been read. The rest of the stream
+                # can only be read once.
+                if self._stream_read:
+                    raise NotSeekable(
+                        'the records of a file object can only be'
+                        ' read once. Use load() to keep them.')
+                self._stream_read = True
+            return self._stream
+        elif self._fileobj is not None:
+            return OffsetFile(self._fileobj, self._fileobj_offset)
+        elif self.compression is not None:
+            return ForwardReader(open_compressed(self.filename))
+        elif self._archive is not None:
+            return closing(self._archive.open(self.member, self.mmap))
+        elif self.mmap:
+            return closing(open_mapped(self.filename))
+        else:
+            return open(self.filename, 'rb')
+
+    def _open_memofile(self, binary_memos=None):
+        if binary_memos is None:
+            binary_memos = self.binary_memos
+
         if self.memofilename and not self.raw:
-            return open_memofile(self.memofilename, self.header.dbversion)
+            if self._memo_buffer is not None:
+                opener = functools.partial(_open_buffer, self._memo_buffer)
+            elif self._archive is not None:
+                opener = functools.partial(self._archive.open,
+                                           self.memofilename)
+            elif get_compression(self.memofilename):
+                opener = functools.partial(open_memo_data,
+                                           self.memofilename)
+            else:
+                opener = None
+
+            if self.memo_cache is not None:
+                self.memo_cache.check(self._get_memofile_key())
+
+            memofile = open_memofile(self.memofilename,
+                                     self.header.dbversion,
+                                     use_mmap=self.mmap,
+                                     cache=self.memo_cache,
+                                     binary_memos=binary_memos,
+                                     opener=opener)
+            if self.memo_index:
+                memofile.index = self._get_memo_index(memofile)
+            return memofile
         else:
             return FakeMemoFile(self.memofilename)
 
+    def _get_memofile_key(self):
+        """Return a key that changes when the memo file changes."""
+        if self._memo_buffer is not None:
+            return ('buffer', len(self._memo_buffer))
+        elif self._archive is None:
+            stat = os.stat(self.memofilename)
+        else:
+            stat = os.stat(self.filename)
+        return (stat.st_mtime, stat.st_size)
+
+    def _get_file_key(self):
+        """Return a key that changes when the DBF file changes."""
+        if self._buffer is not None:
+            return ('buffer', len(self._buffer))
+        elif self._fileobj is not None:
+            return ('fileobj', self._get_file_size())
+        stat = os.stat(self.filename)
+        return (stat.st_mtime, stat.st_size)
+
+    def _get_memo_index(self, memofile):
+        # The index is built once and kept until the file changes.
+        key = self._get_memofile_key()
+        if self._memo_index_key != key:
+            self._memo_index = memofile.build_index()
+            self._memo_index_key = key
+        return self._memo_index
+
+    def _init_lazy_memofile(self):
+        self._lazy_memofile = None
+        self._lazy_memofile_key = None
+        self._lazy_memo_lock = threading.Lock()
+
+    def _close_lazy_memofile(self):
+        if self._lazy_memofile is not None:
+            self._lazy_memofile._close()
+            self._lazy_memofile = None
+
+    def _read_memo(self, index):
+        """Read one memo from the memo file.
+
+        Used by lazy memos, which are read after the record iterator
+        has closed the memo file. The memo file is opened on the first
+        read and kept open until close() is called or the file changes.
+        """
+        with self._lazy_memo_lock:
+            key = self._get_memofile_key()
+            if self._lazy_memofile_key != key:
+                self._close_lazy_memofile()
+                self._lazy_memofile = self._open_memofile()
+                self._lazy_memofile_key = key
+            return self._lazy_memofile[index]
+
+    def _check_columns(self):
+        if self.columns is not None:
+            for name in self.columns:
+                if name not in self.field_names:
+                    raise ValueError('Unknown field: {!r}'.format(name))
+
     def _check_headers(self):
         field_parser = self.parserclass(self)
 
         """Check headers for possible format errors."""
-        for field in self.fields:
+        for field in self._get_fields():
 
             if field.type == 'I' and field.length != 4:
                 message = 'Field type I must have length 4 (was {})'
@@ -282,73 +784,565 @@ class DBF(object):
                 # Todo: return as byte string?
                 raise ValueError('Unknown field type: {!r}'.format(field.type))
 
-    def _skip_record(self, infile):
-        # -1 for the record separator which was already read.
-        infile.seek(self.header.recordlen - 1, 1)
+    def _get_field_slices(self):
+        """Return a list of ``(field, start, end)`` for each field.
+
+        start and end are offsets into the record. Fields are laid out
+        back to back after the one byte deletion flag. If columns is
+        set only those fields are returned, in that order.
+        """
+        slices = []
+        start = 1
+        for field in self.fields:
+            end = start + field.length
+            slices.append((field, start, end))
+            start = end
+
+        if self.columns is not None:
+            by_name = dict((field.name, (field, start, end))
+                           for (field, start, end) in slices)
+            slices = [by_name[name] for name in self.columns]
+
+        return slices
+
+    def _get_fields(self):
+        """Return the fields that are included in records."""
+        return [field for (field, start, end) in self._get_field_slices()]
+
+    @property
+    def record_names(self):
+        """Names of the fields in records, in order.
+
+        This is columns if it is set, otherwise field_names.
+        """
+        return [field.name for field in self._get_fields()]
+
+    def _copy(self):
+        """Return a copy of the table for select() and where().
+
+        The copy shares the ZIP archive (if any) but doesn't close it.
+        """
+        table = copy.copy(self)
+        table._owns_archive = False
+        table._init_lazy_memofile()
+        return table
+
+    def select(self, *columns):
+        """Return a copy of the table which only reads the given fields.
+
+        Records from the copy only have the given fields, in the order
+        given. Fields that are not selected are never parsed, and the
+        memo file is not needed unless a memo field is selected.
+        """
+        table = self._copy()
+        table.columns = list(columns)
+        table._check_columns()
+        table._check_headers()
+        table.memofilename = table._get_memofilename()
+        table._records = None
+        table._deleted = None
+        if self.loaded:
+            table.load(self.storage)
+        return table
+
+    def where(self, field, **conditions):
+        """Return a copy of the table which only reads matching records.
+
+        conditions are one or more of eq, ne, lt, le, gt, ge (compare
+        with a value) and isin (value is in a collection). All
+        conditions must be true for a record to match. Calls can be
+        chained to filter on several fields::
+
+            table.where('STATUS', eq='A').where('AMOUNT', ge=100, lt=500)
+
+        The conditions are tested on the raw data in the record, so
+        records that don't match are never parsed.
+        """
+        # Check the conditions before they are stored.
+        make_predicate(self, field, **conditions)
+
+        table = self._copy()
+        table._filters = self._filters + [(field, conditions)]
+        table._records = None
+        table._deleted = None
+        table._record_counts = None
+        if self.loaded:
+            table.load(self.storage)
+        return table
+
+    def get_handle(self, start=0, stop=None):
+        """Return a picklable DBFHandle for the table.
+
+        The handle can be sent to another process where
+        ``handle.open()`` returns a DBF object without reading the
+        headers again. start and stop are the range of record indexes
+        the handle describes. (By default all records.)
+        """
+        self._check_seekable('get_handle()')
+        if self._buffer is not None or self._fileobj is not None:
+            raise ValueError("tables read from buffers or file objects"
+                             " can't be sent to other processes")
+        return DBFHandle(self, start, stop)
+
+    def _get_predicate(self):
+        """Return a function which tests if a record matches the filters
+        set with where() or None if there are no filters."""
+        return combine_predicates([make_predicate(self, field, **conditions)
+                                   for (field, conditions) in self._filters])
+
+    def _get_file_size(self):
+        self._check_seekable('this operation')
+        if self._buffer is not None:
+            return len(self._buffer)
+        elif self._fileobj is not None:
+            with self._open() as infile:
+                return infile.seek(0, 2)
+        elif self._archive is None:
+            return os.path.getsize(self.filename)
+        else:
+            return self._archive.getsize(self.member)
+
+    def _get_numrecords(self):
+        """Return the number of records in the file.
+
+        This is the record count from the header (which includes
+        deleted records), but never more than the number of whole
+        records that fit in the file.
+        """
+        size = self._get_file_size() - self.header.headerlen
+        return max(0, min(self.header.numrecords,
+                          size // self.header.recordlen))
+
+    def _iter_record_blocks(self, infile, start=0, stop=None):
+        """Read the records from the file in large blocks.
+
+        Yields byte strings that each hold a whole number of records
+        (except possibly a truncated last record). Reading starts at
+        record index start and stops before index stop, at the end of
+        file marker (b'\\x1a') or at the end of the file.
+        """
+        recordlen = self.header.recordlen
+        blocksize = max(self.buffer_size // recordlen, 1) * recordlen
+        read = infile.read
+
+        if stop is None:
+            remaining = None
+        else:
+            remaining = max(stop - start, 0) * recordlen
+
+        # Skip to first record.
+        infile.seek(self.header.headerlen + start * recordlen, 0)
+
+        while remaining is None or remaining > 0:
+            if remaining is None:
+                block = read(blocksize)
+            else:
+                block = read(min(blocksize, remaining))
+                remaining -= len(block)
+
+            if not block:
+                break
+
+            # The first byte of each record is the deletion flag.
+            end = block[::recordlen].find(b'\x1a')
+            if end != -1:
+                # End of records.
+                if end > 0:
+                    yield block[:end * recordlen]
+                break
+
+            yield block
+
+    def _read_record(self, infile, index):
+        """Read the record at the given index.
+
+        Returns the record data or b'' if there is no record at the index.
+        """
+        recordlen = self.header.recordlen
+        infile.seek(self.header.headerlen + index * recordlen, 0)
+        data = infile.read(recordlen)
+        if data[:1] == b'\x1a':
+            # End of records.
+            return b''
+        else:
+            return data
+
+    def _make_record_decoder(self, memofile, recfactory=None):
+        """Build the record decoder for this table.
+
+        recfactory overrides the table's recfactory. See
+        dbfread.decoder for details.
+        """
+        if recfactory is None:
+            recfactory = self.recfactory
+
+        if not self.raw:
+            field_parser = self.parserclass(self, memofile)
+
+        columns = []
+        for field, start, end in self._get_field_slices():
+            if self.raw:
+                parse = None
+            else:
+                parse = field_parser.get_parse_function(field)
+            columns.append((field.name, field, start, end, parse))
+
+        if recfactory == 'tuple':
+            return make_record_decoder(columns, None, 'tuple')
+        elif recfactory in RECORD_TYPES:
+            cls = make_record_class(recfactory, self.record_names)
+            return make_record_decoder(columns, cls, 'args')
+        else:
+            return make_record_decoder(columns, recfactory)
+
+    def _scan_record_counts(self):
+        """Count live and deleted records by scanning the deletion flags.
+
+        Returns a dictionary with counts for b' ' and b'*'.
+        """
+        header = self.header
+        recordlen = header.recordlen
+        end = header.headerlen + header.numrecords * recordlen
+
+        # The record count in the header can be trusted if the records
+        # fill the file (with or without the end of file marker).
+        if self._get_file_size() in (end, end + 1):
+            stop = header.numrecords
+        else:
+            stop = None
+
+        counts = {b' ': 0, b'*': 0}
+        match = self._get_predicate()
+
+        with self._open() as infile:
+            if match is not None:
+                for block in self._iter_record_blocks(infile, 0, stop):
+                    flags = block[::recordlen]
+                    for flag in counts:
+                        i = flags.find(flag)
+                        while i != -1:
+                            if match(block, i * recordlen):
+                                counts[flag] += 1
+                            i = flags.find(flag, i + 1)
+            elif is_mapped(infile):
+                # Slice the flags straight out of the memory map
+                # without copying the rest of the records.
+                if stop is None:
+                    end = len(infile)
+                blocksize = max(self.buffer_size // recordlen, 1) * recordlen
+                for pos in range(header.headerlen, end, blocksize):
+                    flags = infile[pos:min(pos + blocksize, end):recordlen]
+                    eof = flags.find(b'\x1a')
+                    if eof != -1:
+                        flags = flags[:eof]
+                    for flag in counts:
+                        counts[flag] += flags.count(flag)
+                    if eof != -1:
+                        break
+            else:
+                for block in self._iter_record_blocks(infile, 0, stop):
+                    flags = block[::recordlen]
+                    for flag in counts:
+                        counts[flag] += flags.count(flag)
+
+        return counts
 
     def _count_records(self, record_type=b' '):
-        count = 0
-
-        with self.io.open(self.fname, mode = self.mode) as infile:
-            # Skip to first record.
-            infile.seek(self.header.headerlen, 0)
-
-            while True:
-                sep = infile.read(1)
-                if sep == record_type:
-                    count += 1
-                    self._skip_record(infile)
-                elif sep in (b'\x1a', b''):
-                    # End of records.
-                    break
+        self._check_seekable('len()')
+
+        # The counts are cached until the file changes.
+        key = self._get_file_key()
+        if self._record_counts is None or self._record_counts_key != key:
+            self._record_counts = self._scan_record_counts()
+            self._record_counts_key = key
+
+        return self._record_counts.get(record_type, 0)
+
+    def _iter_records(self, record_type=b' ', start=0, stop=None,
+                      recno=False):
+        """Iterate over records with the given deletion flag.
+
+        Only the records with indexes from start up to stop are read.
+        Records that don't match the filters set with where() are
+        skipped. If recno is True ``(recno, record)`` tuples are
+        returned instead, where recno is the FoxPro RECNO() of the
+        record (index + 1).
+        """
+        recordlen = self.header.recordlen
+        for decode, block, base, batch in self._iter_record_batches(
+                (record_type,), start, stop):
+            for i in batch:
+                if recno:
+                    yield base + i, decode(block, i * recordlen)
+                else:
+                    yield decode(block, i * recordlen)
+
+    def _iter_all_records(self, start=0, stop=None, recfactory=None):
+        """Iterate over live and deleted records in one pass.
+
+        Yields ``(recno, flag, record)`` in file order, where flag is
+        b' ' or b'*'. Only the records with indexes from start up to
+        stop are read. recfactory overrides the table's recfactory.
+        """
+        recordlen = self.header.recordlen
+        for decode, block, base, batch in self._iter_record_batches(
+                (b' ', b'*'), start, stop, recfactory):
+            flags = block[::recordlen]
+            for i in batch:
+                yield base + i, flags[i:i + 1], decode(block, i * recordlen)
+
+    def _iter_record_batches(self, record_types, start=0, stop=None,
+                             recfactory=None):
+        """Find the records to read in each block of records.
+
+        This is the record scanner used by all the record iterators.
+        record_types is a tuple of deletion flags to look for (b' '
+        and/or b'*'). Records that don't match the filters set with
+        where() are skipped.
+
+        Yields ``(decode, block, base, batch)`` where batch is a list
+        of the positions of up to MEMO_PREFETCH_RECORDS records in
+        the block, in file order. Each record is decoded with
+        ``decode(block, i * recordlen)`` and its recno is ``base + i``.
+        Memos in the batch are prefetched before it is returned.
+        """
+        with self._open() as infile, self._open_memofile() as memofile:
+            decode = self._make_record_decoder(memofile, recfactory)
+            match = self._get_predicate()
+            prefetch = self._make_memo_prefetcher(memofile)
+            recordlen = self.header.recordlen
+
+            base = start + 1
+            for block in self._iter_record_blocks(infile, start, stop):
+                flags = block[::recordlen]
+                indexes = _find_flags(flags, record_types[0])
+                for record_type in record_types[1:]:
+                    if record_type in flags:
+                        # Timsort merges the sorted runs in linear time.
+                        indexes = sorted(indexes
+                                         + _find_flags(flags, record_type))
+                if match is not None:
+                    indexes = [i for i in indexes
+                               if match(block, i * recordlen)]
+
+                if prefetch is None:
+                    if indexes:
+                        yield decode, block, base, indexes
                 else:
-                    self._skip_record(infile)
+                    for n in range(0, len(indexes), MEMO_PREFETCH_RECORDS):
+                        batch = indexes[n:n + MEMO_PREFETCH_RECORDS]
+                        prefetch(block, batch)
+                        yield decode, block, base, batch
+                base += len(flags)
+
+    def _make_memo_prefetcher(self, memofile):
+        """Return a function which prefetches the memos of records.
 
-        return count
+        The function takes a block of records and a list of record
+        indexes in the block. Returns None if there are no memos to
+        prefetch.
+        """
+        if self.raw or self.lazy_memos or self.mmap or not self.memofilename:
+            return None
+
+        vfp = self.header.dbversion in [0x30, 0x31, 0x32]
+        slices = [(start, end) for (field, start, end)
+                  in self._get_field_slices()
+                  if field.type in 'MGP' or (field.type == 'B' and not vfp)]
+        if not slices:
+            return None
 
-    def _iter_records(self, record_type=b' '):
-        with self.io.open(self.fname, mode = self.mode) as infile, \
-             self._open_memofile() as memofile:
+        parse_index = self.parserclass(self)._parse_memo_index
+        recordlen = self.header.recordlen
 
-            # Skip to first record.
-            infile.seek(self.header.headerlen, 0)
+        def prefetch(block, batch):
+            indexes = []
+            for i in batch:
+                offset = i * recordlen
+                for start, end in slices:
+                    try:
+                        indexes.append(
+                            parse_index(block[offset + start:offset + end]))
+                    except ValueError:
+                        # Raised by the field parser when the record
+                        # is decoded.
+                        pass
+            memofile.prefetch(indexes)
 
-            if not self.raw:
-                field_parser = self.parserclass(self, memofile)
-                parse = field_parser.parse
+        return prefetch
 
-            # Shortcuts for speed.
-            skip_record = self._skip_record
-            read = infile.read
+    def iter_all(self):
+        """Iterate over live and deleted records in one pass.
 
-            while True:
-                sep = read(1)
+        Yields ``(recno, is_deleted, record)`` in file order, where
+        recno is the FoxPro ``RECNO()`` of the record (index + 1).
+        Records are read from the file even if the table is loaded.
+        """
+        return ((recno, flag == b'*', record) for (recno, flag, record)
+                in self._iter_all_records())
+
+    def _get_records(self, index, record_type=None):
+        """Get records by index or slice.
 
-                if sep == record_type:
-                    if self.raw:
-                        items = [(field.name, read(field.length)) \
-                                 for field in self.fields]
-                    else:
-                        items = [(field.name,
-                                  parse(field, read(field.length))) \
-                                 for field in self.fields]
+        If record_type is not None, records with a different deletion
+        flag or which don't match the filters set with where() are
+        left out of slices and raise IndexError for a single index.
+        """
+        self._check_seekable('random access to records')
+        numrecords = self._get_numrecords()
 
-                    yield self.recfactory(items)
+        if record_type is None:
+            match = None
+        else:
+            match = self._get_predicate()
 
-                elif sep in (b'\x1a', b''):
-                    # End of records.
-                    break
+        if isinstance(index, slice):
+            start, stop, step = index.indices(numrecords)
+            if step == 1 and record_type is not None:
+                return list(self._iter_records(record_type, start, stop))
+
+            records = []
+            with self._open() as infile, \
+                 self._open_memofile() as memofile:
+                decode = self._make_record_decoder(memofile)
+                for i in range(start, stop, step):
+                    data = self._read_record(infile, i)
+                    if not data or record_type not in (None, data[:1]):
+                        continue
+                    elif match is None or match(data, 0):
+                        records.append(decode(data, 0))
+            return records
+
+        if index < 0:
+            index += numrecords
+        if not 0 <= index < numrecords:
+            raise IndexError('record index out of range')
+
+        with self._open() as infile, self._open_memofile() as memofile:
+            data = self._read_record(infile, index)
+            if not data:
+                raise IndexError('record index out of range')
+            elif record_type not in (None, data[:1]):
+                if data[:1] == b'*':
+                    message = 'record {} is deleted'
                 else:
-                    skip_record(infile)
+                    message = 'record {} is not deleted'
+                raise IndexError(message.format(index))
+            elif match is not None and not match(data, 0):
+                message = 'record {} does not match the filter'
+                raise IndexError(message.format(index))
+
+            return self._make_record_decoder(memofile)(data, 0)
+
+    def get_record(self, index):
+        """Return the record at the given index.
+
+        The index is the position of the record in the file, counting
+        both live and deleted records from 0, so ``get_record(i)`` is
+        the record FoxPro calls ``RECNO() == i + 1``. Negative indexes
+        count from the end. The record is read directly from its
+        position in the file. Deleted records are also returned.
+
+        Raises IndexError if there is no record at the index.
+        """
+        return self._get_records(index)
+
+    def to_numpy(self, columns=None):
+        """Read records into NumPy arrays.
+
+        Returns an ordered dictionary of field name to array with one
+        array for each field in columns (default: all fields). Deleted
+        records are left out. Requires NumPy.
+        """
+        from .numpy_reader import read_numpy
+        return read_numpy(self, columns)
+
+    def DataFrame(self, columns=None, dtype=None, categorical=None,
+                  chunksize=None):
+        """Read records into a Pandas data frame.
+
+        Columns are decoded straight into typed arrays (see
+        ``to_numpy()``). columns is a list of fields to read (default:
+        all fields). dtype is a dtype or a dictionary of field name to
+        dtype to convert columns to. categorical is a list of fields
+        to return as categoricals.
+
+        If chunksize is passed an iterator is returned which yields
+        one data frame for every chunksize records in the file.
+        Requires Pandas.
+        """
+        from .pandas_reader import iter_dataframes, read_dataframe
+        if chunksize is None:
+            return read_dataframe(self, columns, dtype, categorical)
+        else:
+            return iter_dataframes(self, columns, dtype, categorical,
+                                   chunksize)
 
-    def DataFrame(self):
-        import pandas as pd
-        df = pd.DataFrame()
-        return df.from_records(self.records)
+    def iter_arrow_batches(self, batch_size=65536, columns=None,
+                           dictionary=None):
+        """Read records as Apache Arrow record batches.
+
+        Yields one ``pyarrow.RecordBatch`` for every batch_size records
+        in the file. The schema is derived from the field headers.
+        columns is a list of fields to read (default: all fields) and
+        dictionary is a list of text fields to dictionary encode.
+        Requires PyArrow.
+        """
+        from .arrow_reader import iter_arrow_batches
+        return iter_arrow_batches(self, batch_size, columns, dictionary)
+
+    def to_parquet(self, path, batch_size=65536, columns=None,
+                   dictionary=None, **kwargs):
+        """Write records to a Parquet file.
+
+        Records are written one batch at a time (see
+        ``iter_arrow_batches()``) so the table is never held in
+        memory. Extra keyword arguments are passed to
+        ``pyarrow.parquet.ParquetWriter``. Requires PyArrow.
+        """
+        from .arrow_reader import write_parquet
+        write_parquet(self, path, batch_size, columns, dictionary, **kwargs)
+
+    def to_feather(self, path, batch_size=65536, columns=None,
+                   dictionary=None, compression=None):
+        """Write records to a Feather (Arrow IPC) file.
+
+        Records are written one batch at a time (see
+        ``iter_arrow_batches()``) so the table is never held in
+        memory. compression can be 'lz4' or 'zstd'. Requires PyArrow.
+        """
+        from .arrow_reader import write_feather
+        write_feather(self, path, batch_size, columns, dictionary,
+                      compression)
+
+    def parallel_iter(self, workers=None, ordered=True, chunksize=None):
+        """Read records in several processes.
+
+        The table is split into ranges of chunksize records which are
+        read and parsed by a pool of worker processes. Each worker
+        opens its own DBF and memo file. If ordered is False records
+        are returned in the order the ranges are finished. workers
+        defaults to the number of CPUs.
+
+        recfactory and parserclass must be picklable.
+        """
+        from .parallel import parallel_scan
+        return parallel_scan(self, None, workers, ordered, chunksize)
+
+    def parallel_map(self, func, workers=None, ordered=True, chunksize=None):
+        """Call func(record) for every record in several processes.
+
+        Works like parallel_iter() but func is called in the worker
+        processes and the results are returned instead of the
+        records. func must be picklable (a function defined at the top
+        level of a module).
+        """
+        from .parallel import parallel_scan
+        return parallel_scan(self, func, workers, ordered, chunksize)
 
     def __iter__(self):
         if self.loaded:
-            return list.__iter__(self._records)
+            return iter(self._records)
         else:
             return self._iter_records()
 
@@ -367,4 +1361,5 @@ class DBF(object):
 
     def __exit__(self, type, value, traceback):
         self.unload()
+        self.close()
         return False
@@ -0,0 +1,80 @@
+"""
+Builds record decoders.
+
+A record decoder is a function which is built once for a table (when
+iteration starts) and then called for every record. It takes a block
+of records and the offset of a record in the block and returns the
+record as produced by recfactory.
+
+The decoder is generated as Python source with one slice and one
+parse function call per field, so that no field type lookup or
+offset computation is done per record. For a table with the fields
+NAME (C 16) and BIRTHDATE (D 8) the generated source looks like this::
+
+    def decode(block, offset):
+        return recfactory([
+            (name0, parse0(field0, block[offset + 1:offset + 17])),
+            (name1, parse1(field1, block[offset + 17:offset + 25])),
+        ])
+
+For the compact record types in dbfread.records the values are passed
+directly, without the list of pairs::
+
+    def decode(block, offset):
+        return recfactory(
+            parse0(field0, block[offset + 1:offset + 17]),
+            parse1(field1, block[offset + 17:offset + 25]),
+        )
+
+or, for plain tuples, ``return (...)``.
+"""
+
+
+def make_record_decoder(columns, recfactory, style='items'):
+    """Create a record decoder.
+
+    columns is a list of ``(name, field, start, end, parse)`` where
+    start and end are offsets into the record and parse is called as
+    ``parse(field, data)``. If parse is None the raw bytes are used as
+    the value.
+
+    style is how records are made: 'items' calls recfactory with a
+    list of ``(name, value)`` pairs, 'args' calls it with the values
+    as arguments and 'tuple' returns a tuple of the values
+    (recfactory is not used).
+    """
+    namespace = {'recfactory': recfactory}
+    if style == 'items':
+        start_line, item, end_line = ('    return recfactory([',
+                                      '        (name{}, {}),', '    ])')
+    elif style == 'args':
+        start_line, item, end_line = ('    return recfactory(',
+                                      '        {1},', '    )')
+    elif style == 'tuple':
+        start_line, item, end_line = ('    return (',
+                                      '        {1},', '    )')
+    else:
+        raise ValueError('unknown decoder style {!r}'.format(style))
+
+    lines = ['def decode(block, offset):', start_line]
+
+    for i, (name, field, start, end, parse) in enumerate(columns):
+        namespace['name{}'.format(i)] = name
+        namespace['field{}'.format(i)] = field
+        namespace['parse{}'.format(i)] = parse
+
+        data = 'block[offset + {}:offset + {}]'.format(start, end)
+        if parse is None:
+            value = data
+        else:
+            value = 'parse{0}(field{0}, {1})'.format(i, data)
+        lines.append(item.format(i, value))
+
+    lines.append(end_line)
+
+    source = '\n'.join(lines) + '\n'
+    exec(compile(source, '<record decoder>', 'exec'), namespace)
+
+    decode = namespace['decode']
+    decode.source = source
+    return decode
@@ -15,8 +15,7 @@ class DeprecatedDBF(DBF, list):
 
     def load(self):
         if not self.loaded:
-            self[:] = self._iter_records(b' ')
-            self._deleted = list(self._iter_records(b'*'))
+            self[:], self._deleted = self._load_records()
 
     def unload(self):
         # self.loaded is not checked here because this
@@ -1,3 +1,5 @@
+import io
+
 class DBFNotFound(IOError):
     """Raised if the DBF file was not found."""
     pass
@@ -5,5 +7,13 @@ class DBFNotFound(IOError):
 class MissingMemoFile(IOError):
     """Raised if the corresponding memo file was not found."""
 
-__all__ = ['DBFNotFound', 'MissingMemoFile']
+class NotSeekable(io.UnsupportedOperation, TypeError):
+    """Raised if an operation needs to seek in a table that is read
+    from a compressed file or a file object.
+
+    This is also a TypeError so ``list(table)`` doesn't fail when it
+    asks for the length.
+    """
+
+__all__ = ['DBFNotFound', 'MissingMemoFile', 'NotSeekable']
 
@@ -5,7 +5,7 @@ import sys
 import datetime
 import struct
 from decimal import Decimal
-from .memo import BinaryMemo
+from .memo import BinaryMemo, LazyMemo, MemoStream
 
 PY2 = sys.version_info[0] == 2
 
@@ -25,6 +25,12 @@ class InvalidValue(bytes):
             
         return 'InvalidValue({})'.format(text)
 
+def _function(method):
+    # Bound and unbound methods in Python 2 wrap the function in
+    # __func__. Python 3 only does this for bound methods.
+    return getattr(method, '__func__', method)
+
+
 class FieldParser:
     def __init__(self, table, memofile=None):
         """Create a new field parser
@@ -36,6 +42,7 @@ class FieldParser:
         self.encoding = table.encoding
         self.char_decode_errors = table.char_decode_errors
         self._lookup = self._create_lookup_table()
+        self.lazy_memos = getattr(table, 'lazy_memos', False)
         if memofile:
             self.get_memo = memofile.__getitem__
         else:
@@ -69,6 +76,23 @@ class FieldParser:
         """
         return field_type in self._lookup
 
+    def get_parse_function(self, field):
+        """Return the function used to parse values of the field
+
+        The function is called as ``func(field, data)``. This is used
+        by ``DBF`` to look up the parser for each field once instead
+        of once per record. If ``parse()`` is overridden in a subclass
+        it is returned for all fields so it will still be called for
+        every value.
+        """
+        if _function(self.parse) is not _function(FieldParser.parse):
+            return self.parse
+
+        try:
+            return self._lookup[field.type]
+        except KeyError:
+            raise ValueError('Unknown field type: {!r}'.format(field.type))
+
     def parse(self, field, data):
         """Parse field and return value"""
         try:
@@ -145,10 +169,33 @@ class FieldParser:
         Returns memo index (an integer), which can be used to look up
         the corresponding memo in the memo file.
         """
-        memo = self.get_memo(self._parse_memo_index(data))
+        index = self._parse_memo_index(data)
+        if self.lazy_memos:
+            return self._get_lazy_memo(index, self._read_text_memo)
+
+        return self._decode_memo(self.get_memo(index))
+
+    def _get_lazy_memo(self, index, read):
+        if index <= 0 or self.table.memofilename is None:
+            # Missing memo files are ignored like in get_memo().
+            return None
+        else:
+            return LazyMemo(read, index, self.encoding)
+
+    def _read_text_memo(self, index):
+        return self._decode_memo(self.table._read_memo(index))
+
+    def _get_binary_memo(self, data):
+        index = self._parse_memo_index(data)
+        if self.lazy_memos:
+            return self._get_lazy_memo(index, self.table._read_memo)
+        else:
+            return self.get_memo(index)
+
+    def _decode_memo(self, memo):
         # Visual FoxPro allows binary data in memo fields.
         # These should not be decoded as string.
-        if isinstance(memo, BinaryMemo):
+        if isinstance(memo, (BinaryMemo, memoryview, MemoStream)):
             return memo
         else:
             if memo is None:
@@ -233,19 +280,19 @@ class FieldParser:
         if self.dbversion in [0x30, 0x31, 0x32]:
             return struct.unpack('d', data)[0]
         else:
-            return self.get_memo(self._parse_memo_index(data))
+            return self._get_binary_memo(data)
 
     def parseG(self, field, data):
         """OLE Object stored in memofile.
 
         The raw data is returned as a binary string."""
-        return self.get_memo(self._parse_memo_index(data))
+        return self._get_binary_memo(data)
 
     def parseP(self, field, data):
         """Picture stored in memofile.
 
         The raw data is returned as a binary string."""
-        return self.get_memo(self._parse_memo_index(data))
+        return self._get_binary_memo(data)
 
 
     # Autoincrement field ('+')
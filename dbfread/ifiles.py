@@ -58,4 +58,16 @@ def ifind(pat, ext=None):
     else:
         return None
 
-__all__ = ['ipat', 'ifnmatch', 'iglob', 'ifind']
+def ilistdir(dirname):
+    """List a directory for case insensitive lookups.
+
+    Returns a dictionary of lowercase file name to file name. This can
+    be used to look up many files in the same directory with only one
+    directory listing.
+    """
+    listing = {}
+    for name in sorted(os.listdir(dirname or '.')):
+        listing.setdefault(name.lower(), name)
+    return listing
+
+__all__ = ['ipat', 'ifnmatch', 'iglob', 'ifind', 'ilistdir']
@@ -0,0 +1,159 @@
+"""
+Open and read many tables at once.
+
+FoxPro applications often store their data as a directory of hundreds
+of related DBF and memo files. open_many() opens (and optionally
+processes) them concurrently in a thread or process pool. An error in
+one table is returned with that table's result instead of stopping
+the others.
+
+Each directory is listed only once, and the DBF and memo file names
+are looked up in the listing instead of with one case insensitive
+glob per file.
+"""
+import os
+import glob
+import functools
+import collections
+import multiprocessing
+from .dbf import DBF
+from .ifiles import ilistdir
+
+class TableResult(collections.namedtuple('TableResult',
+                                         ['filename', 'table', 'value',
+                                          'error'])):
+    """Result of opening a table with open_many().
+
+    filename is the DBF file name. table is the DBF object and value
+    the return value of func(table), or None if func was not passed.
+    If the table could not be opened or func failed, error is the
+    exception and the other fields are None.
+    """
+    # (The docstring can't be set on the namedtuple in Python 2.)
+    __slots__ = ()
+
+
+def _expand_paths(paths):
+    """Expand directories and glob patterns to a list of file names."""
+    if isinstance(paths, str):
+        paths = [paths]
+
+    filenames = []
+    for path in paths:
+        if os.path.isdir(path):
+            filenames.extend(name for name in glob.glob(os.path.join(path, '*'))
+                             if name.lower().endswith('.dbf'))
+        elif glob.has_magic(path):
+            filenames.extend(glob.glob(path))
+        else:
+            filenames.append(path)
+    return sorted(filenames)
+
+
+def _find_files(filenames):
+    """Find the DBF and memo file for each file name.
+
+    Returns a list of (filename, memofilename). Files that are not
+    found are returned as given so DBF will raise the usual errors.
+    """
+    listings = {}
+    found = []
+    for filename in filenames:
+        dirname, basename = os.path.split(filename)
+        if dirname not in listings:
+            try:
+                listings[dirname] = ilistdir(dirname)
+            except OSError:
+                listings[dirname] = {}
+        listing = listings[dirname]
+
+        name = listing.get(basename.lower())
+        if name is not None:
+            filename = os.path.join(dirname, name)
+
+        memofilename = None
+        stem = os.path.splitext(basename)[0].lower()
+        for ext in ['.fpt', '.dbt']:
+            name = listing.get(stem + ext)
+            if name is not None:
+                memofilename = os.path.join(dirname, name)
+                break
+
+        found.append((filename, memofilename))
+    return found
+
+
+def _open_table(filename, memofilename, func, options, picklable):
+    try:
+        table = DBF(filename, ignorecase=False, memofilename=memofilename,
+                    **options)
+        if func is None:
+            value = None
+        else:
+            value = func(table)
+        if picklable:
+            # DBF objects can't be pickled. Send a handle instead.
+            if table.seekable:
+                table = table.get_handle()
+            else:
+                # Compressed tables have no handle and are opened
+                # again from the file.
+                table = functools.partial(DBF, filename, ignorecase=False,
+                                          memofilename=memofilename,
+                                          **options)
+        return TableResult(filename, table, value, None)
+    except Exception as err:
+        return TableResult(filename, None, None, err)
+
+
+def open_many(paths, func=None, workers=None, executor='thread', **options):
+    """Open many tables concurrently.
+
+    paths is a file name, directory or glob pattern, or a list of
+    these. Directories are searched for .dbf files. Each table is
+    opened with DBF(filename, **options) and if func is passed,
+    func(table) is called in the worker.
+
+    executor is 'thread' or 'process'. For 'process' func and the
+    options must be picklable.
+
+    Returns an iterator of TableResult, in the order the tables are
+    finished.
+    """
+    try:
+        from concurrent.futures import (ThreadPoolExecutor,
+                                        ProcessPoolExecutor, as_completed)
+    except ImportError:
+        raise ImportError('open_many() needs concurrent.futures. On'
+                          ' Python 2 install it with: pip install futures')
+
+    if executor == 'thread':
+        pool = ThreadPoolExecutor(max_workers=workers or
+                                  multiprocessing.cpu_count() * 5)
+        picklable = False
+    elif executor == 'process':
+        pool = ProcessPoolExecutor(max_workers=workers)
+        picklable = True
+    else:
+        raise ValueError('executor must be thread or process'
+                         ' (was {!r})'.format(executor))
+
+    if options.pop('ignorecase', True):
+        files = _find_files(_expand_paths(paths))
+    else:
+        files = [(filename, None) for filename in _expand_paths(paths)]
+
+    with pool:
+        futures = [pool.submit(_open_table, filename, memofilename,
+                               func, options, picklable)
+                   for (filename, memofilename) in files]
+
+        for future in as_completed(futures):
+            result = future.result()
+            if picklable and result.table is not None:
+                if isinstance(result.table, functools.partial):
+                    table = result.table()
+                else:
+                    table = result.table.open()
+                result = result._replace(table=table)
+            yield result
@@ -8,9 +8,14 @@ VFP == Visual FoxPro
 DB3 == dBase III
 DB4 == dBase IV
 """
-from collections import namedtuple
+import io
+import bisect
+import threading
+from collections import namedtuple, OrderedDict
 from .ifiles import ifind
 from .struct_parser import StructParser
+from .mmapfile import open_mapped, is_mapped, get_view
+from .streams import strip_compression
 
 
 
@@ -28,6 +33,15 @@ VFPMemoHeader = StructParser(
     ['type',
      'length'])
 
+DB4FileHeader = StructParser(
+    'DBase4FileHeader',
+    '<LL8sLH',
+    ['nextblock',
+     'reserved1',
+     'dbf_filename',
+     'reserved2',
+     'blocksize'])
+
 DB4MemoHeader = StructParser(
     'DBase4MemoHeader',
     '<LL',
@@ -52,6 +66,108 @@ class TextMemo(VFPMemo):
     pass
 
 
+def _identity(value):
+    return value
+
+
+class LazyMemo(object):
+    """A memo that is read from the memo file when it is first used.
+
+    Works like the memo value (a string or bytes) for len(), str(),
+    bytes(), comparison and iteration. The value itself is available
+    as ``value``.
+    """
+    __slots__ = ['index', '_read', '_encoding', '_value']
+
+    _unread = object()
+
+    def __init__(self, read, index, encoding='ascii'):
+        self.index = index
+        self._read = read
+        self._encoding = encoding
+        self._value = self._unread
+
+    @property
+    def value(self):
+        if self._value is self._unread:
+            self._value = self._read(self.index)
+        return self._value
+
+    @property
+    def loaded(self):
+        """True if the memo has been read."""
+        return self._value is not self._unread
+
+    def __len__(self):
+        return len(self.value)
+
+    def __str__(self):
+        return str(self.value)
+
+    def __unicode__(self):
+        return unicode(self.value)
+
+    def __bytes__(self):
+        value = self.value
+        if isinstance(value, bytes):
+            return bytes(value)
+        else:
+            return value.encode(self._encoding)
+
+    def __iter__(self):
+        return iter(self.value)
+
+    def __getitem__(self, index):
+        return self.value[index]
+
+    def __contains__(self, item):
+        return item in self.value
+
+    def __eq__(self, other):
+        if isinstance(other, LazyMemo):
+            other = other.value
+        return self.value == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __bool__(self):
+        return bool(self.value)
+
+    __nonzero__ = __bool__
+
+    def __getattr__(self, name):
+        # String methods.
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.value, name)
+
+    def __reduce__(self):
+        # The memo file can't be pickled, so send the value instead.
+        return (_identity, (self.value,))
+
+    def __repr__(self):
+        if self.loaded:
+            return 'LazyMemo({!r})'.format(self._value)
+        else:
+            return '<LazyMemo at index {}>'.format(self.index)
+
+
+# Ways to return Visual FoxPro binary memos.
+BINARY_MEMO_TYPES = ['bytes', 'memoryview', 'stream']
+
+# Memos that are prefetched are read in runs. Gaps up to this size
+# between two memos are read (and thrown away) instead of seeking over
+# them, and no single read is larger than PREFETCH_MAX_READ.
+PREFETCH_MAX_GAP = 65536
+PREFETCH_MAX_READ = 4 * 1024 * 1024
+
+# DB3MemoFile.build_index() reads the file in chunks of this size.
+INDEX_CHUNK_SIZE = 1024 * 1024
+
 VFP_TYPE_MAP = {
     0x0: PictureMemo,
     0x1: TextMemo,
@@ -59,26 +175,269 @@ VFP_TYPE_MAP = {
 }
 
 
+class MemoCache(object):
+    """LRU cache of memos, bounded by the total size of the memos.
+
+    The cache is kept by the DBF object and shared by all memo files
+    opened from it. The number of hits, misses and evictions are
+    counted so the size can be tuned.
+    """
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._memos = OrderedDict()
+        self._key = None
+        self._lock = threading.Lock()
+
+    def check(self, key):
+        """Clear the cache if key has changed since the last call.
+
+        key should change when the memo file changes, for example the
+        modification time and size of the file.
+        """
+        with self._lock:
+            if key != self._key:
+                self._memos.clear()
+                self.size = 0
+                self._key = key
+
+    def get(self, index, default=None):
+        with self._lock:
+            try:
+                memo = self._memos.pop(index)
+            except KeyError:
+                self.misses += 1
+                return default
+            # Move to the end (most recently used).
+            self._memos[index] = memo
+            self.hits += 1
+            return memo
+
+    def put(self, index, memo):
+        size = len(memo)
+        if size > self.maxsize:
+            return
+
+        with self._lock:
+            if index in self._memos:
+                return
+            self._memos[index] = memo
+            self.size += size
+            while self.size > self.maxsize:
+                _, old = self._memos.popitem(last=False)
+                self.size -= len(old)
+                self.evictions += 1
+
+    def __contains__(self, index):
+        return index in self._memos
+
+    def clear(self):
+        with self._lock:
+            self._memos.clear()
+            self.size = 0
+
+    def stats(self):
+        """Return a dictionary of the counters."""
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': self.size,
+                'maxsize': self.maxsize,
+                'count': len(self._memos)}
+
+    def __repr__(self):
+        return '<MemoCache {}/{} bytes, {} hits, {} misses>'.format(
+            self.size, self.maxsize, self.hits, self.misses)
+
+
+class MemoStream(io.RawIOBase):
+    """A binary memo that is read from the memo file as a stream.
+
+    This is a read only, seekable file-like object over the memo data.
+    The memo file is opened with open_file() on the first read and
+    closed by close().
+    memo_type is the class the memo would have been returned as
+    (PictureMemo, ObjectMemo or BinaryMemo).
+    """
+    def __init__(self, open_file, offset, length, memo_type=BinaryMemo):
+        io.RawIOBase.__init__(self)
+        self._open_file = open_file
+        self.offset = offset
+        self.length = length
+        self.memo_type = memo_type
+        self._file = None
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, pos, whence=0):
+        if whence == 1:
+            pos += self._pos
+        elif whence == 2:
+            pos += self.length
+        self._pos = max(pos, 0)
+        return self._pos
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self.length - self._pos)
+        if size <= 0:
+            return 0
+
+        if self._file is None:
+            self._file = self._open_file()
+        self._file.seek(self.offset + self._pos)
+        data = self._file.read(size)
+        buffer[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        io.RawIOBase.close(self)
+
+    def __len__(self):
+        return self.length
+
+    def __repr__(self):
+        return '<MemoStream {} bytes at {}>'.format(self.length, self.offset)
+
+
 class MemoFile(object):
-    def __init__(self, filename):
+    def __init__(self, filename, use_mmap=False, cache=None,
+                 binary_memos='bytes', opener=None):
+        if binary_memos == 'memoryview':
+            # Views are slices of the memory map.
+            use_mmap = True
+
         self.filename = filename
+        self.use_mmap = use_mmap
+        self.cache = cache
+        self.binary_memos = binary_memos
+        self.index = None
+        # Used to open files in archives. Called with use_mmap.
+        self._opener = opener
+        self._prefetched = {}
         self._open()
         self._init()
 
     def _init(self):
         pass
 
+    def _open_file(self, use_mmap=False):
+        if self._opener is not None:
+            return self._opener(use_mmap=use_mmap)
+        elif use_mmap:
+            return open_mapped(self.filename)
+        else:
+            return open(self.filename, 'rb')
+
     def _open(self):
-        self.file = open(self.filename, 'rb')
+        self.file = self._open_file(self.use_mmap)
         # Shortcuts for speed.
         self._read = self.file.read
         self._seek = self.file.seek
 
     def _close(self):
-        self.file.close()
+        try:
+            self.file.close()
+        except BufferError:
+            # Memoryviews of the map are still in use. The map is
+            # closed when the last of them is released.
+            pass
 
     def __getitem__(self, index):
-        raise NotImplemented
+        if index <= 0:
+            return None
+
+        cache = self.cache
+        if cache is not None:
+            memo = cache.get(index)
+            if memo is not None:
+                return memo
+
+        memo = self._prefetched.get(index)
+        if memo is None:
+            memo = self._read_memo(index)
+        if cache is not None and isinstance(memo, bytes):
+            cache.put(index, memo)
+        return memo
+
+    def _read_memo(self, index):
+        raise NotImplementedError
+
+    def build_index(self):
+        """Return an index of the memos in the file, or None if this
+        memo file type doesn't use one."""
+        return None
+
+    # Used by prefetch(). Subclasses that can parse memos out of a
+    # buffer set the block size and override _memo_from_buffer().
+    _blocksize = None
+
+    def _memo_from_buffer(self, data, pos):
+        """Return the memo at pos in data.
+
+        Returns None if the memo doesn't fit in data.
+        """
+        raise NotImplementedError
+
+    def prefetch(self, indexes):
+        """Read the memos at indexes ahead of time.
+
+        Memos are read in file order and memos that are close together
+        are read with one read() call. The memos are kept until the
+        next call to prefetch() and are then returned by
+        ``memofile[index]`` without reading the file again.
+        """
+        self._prefetched = prefetched = {}
+        if (self._blocksize is None or self.use_mmap
+                or self.binary_memos == 'stream'):
+            # Nothing to gain with a memory map, and streamed memos
+            # should not be read into memory.
+            return
+
+        cache = self.cache
+        blocksize = self._blocksize
+        offsets = sorted(set((index * blocksize, index)
+                             for index in indexes
+                             if index > 0 and
+                             (cache is None or index not in cache)))
+
+        # Split into runs of memos that are close together.
+        runs = []
+        run = []
+        for offset, index in offsets:
+            if run and (offset - run[-1][0] > PREFETCH_MAX_GAP
+                        or offset - run[0][0] > PREFETCH_MAX_READ):
+                runs.append(run)
+                run = []
+            run.append((offset, index))
+        if run:
+            runs.append(run)
+
+        for run in runs:
+            first = run[0][0]
+            self._seek(first)
+            # Memos usually end where the next one begins, so only the
+            # last one may need to be read separately.
+            data = self._read(run[-1][0] - first + blocksize)
+            for offset, index in run:
+                memo = self._memo_from_buffer(data, offset - first)
+                if memo is None:
+                    memo = self._read_memo(index)
+                prefetched[index] = memo
 
     def __enter__(self):
         return self
@@ -101,60 +460,147 @@ class FakeMemoFile(MemoFile):
 class VFPMemoFile(MemoFile):
     def _init(self):
         self.header = VFPFileHeader.read(self.file)
+        self._blocksize = self.header.blocksize
 
-    def __getitem__(self, index):
+    def _memo_from_buffer(self, data, pos):
+        end = pos + VFPMemoHeader.size
+        if end > len(data):
+            return None
+        memo_header = VFPMemoHeader.unpack(data[pos:end])
+        if end + memo_header.length > len(data):
+            return None
+        data = data[end:end + memo_header.length]
+        return VFP_TYPE_MAP.get(memo_header.type, BinaryMemo)(data)
+
+    def _read_memo(self, index):
         """Get a memo from the file."""
         if index <= 0:
             return None
 
         self._seek(index * self.header.blocksize)
         memo_header = VFPMemoHeader.read(self.file)
+        memo_type = VFP_TYPE_MAP.get(memo_header.type, BinaryMemo)
+
+        if memo_type is not TextMemo and self.binary_memos != 'bytes':
+            start = index * self.header.blocksize + VFPMemoHeader.size
+            end = start + memo_header.length
+            if self.binary_memos == 'stream':
+                return MemoStream(self._open_file, start, memo_header.length,
+                                  memo_type)
+            elif is_mapped(self.file):
+                if end > len(self.file):
+                    raise IOError('EOF reached while reading memo')
+                try:
+                    view = get_view(self.file)
+                except TypeError:
+                    # Memory maps in Python 2 have no buffer interface
+                    # for memoryview(), so the memo has to be copied.
+                    return memoryview(self.file[start:end])
+                return view[start:end]
 
         data = self._read(memo_header.length)
         if len(data) != memo_header.length:
             raise IOError('EOF reached while reading memo')
         
-        return VFP_TYPE_MAP.get(memo_header.type, BinaryMemo)(data)
+        return memo_type(data)
 
 
 class DB3MemoFile(MemoFile):
-    """dBase III memo file."""
-    # Code from dbf.py
-    def __getitem__(self, index):
+    """dBase III memo file.
+
+    Memos start at a block boundary and end with b'\\x1a'. If an
+    index of the end of memo markers has been built with
+    build_index(), memos are read with one read() call.
+    """
+    _blocksize = 512
+
+    def build_index(self):
+        """Return the offsets of all end of memo markers in the file.
+
+        The file is read once from start to end.
+        """
+        index = []
+        self._seek(0)
+        offset = 0
+        while True:
+            data = self._read(INDEX_CHUNK_SIZE)
+            if not data:
+                break
+            i = data.find(b'\x1a')
+            while i != -1:
+                index.append(offset + i)
+                i = data.find(b'\x1a', i + 1)
+            offset += len(data)
+        return index
+
+    def _memo_from_buffer(self, data, pos):
+        end_of_memo = data.find(b'\x1a', pos)
+        if end_of_memo == -1:
+            return None
+        return data[pos:end_of_memo]
+
+    def _read_memo(self, index):
         if index <= 0:
             return None
 
-        block_size = 512
-        self._seek(index * block_size)
-        data = b''
+        start = index * self._blocksize
+        self._seek(start)
+
+        if self.index is not None:
+            i = bisect.bisect_left(self.index, start)
+            if i < len(self.index):
+                return self._read(self.index[i] - start)
+            else:
+                # No end of memo marker.
+                return self._read()
+
+        # Todo: some files (help.dbt) has only one field separator.
+        # Is this enough for all file though?
+        # Alternative end of memo markers:
+        # \x1a\x1a
+        # \x0d\x0a
+        chunks = []
         while True:
-            newdata = self._read(block_size)
-            if not newdata:
-                return data
-            data += newdata
+            data = self._read(self._blocksize)
+            if not data:
+                break
 
-            # Todo: some files (help.dbt) has only one field separator.
-            # Is this enough for all file though?
+            # Only the new data needs to be searched.
             end_of_memo = data.find(b'\x1a')
             if end_of_memo != -1:
-                return data[:end_of_memo]
+                chunks.append(data[:end_of_memo])
+                break
+            chunks.append(data)
 
-            # Alternative end of memo markers:
-            # \x1a\x1a
-            # \x0d\x0a
+        return b''.join(chunks)
 
-        return data[:eom]        
 
 class DB4MemoFile(MemoFile):
     """dBase IV memo file"""
-    def __getitem__(self, index):
-        if index <= 0:
+    def _init(self):
+        # The block size is stored in the header. Older files may
+        # have 0 here, which means the default of 512 bytes.
+        data = self._read(DB4FileHeader.size)
+        if len(data) == DB4FileHeader.size:
+            self._blocksize = DB4FileHeader.unpack(data).blocksize or 512
+        else:
+            self._blocksize = 512
+
+    def _memo_from_buffer(self, data, pos):
+        end = pos + DB4MemoHeader.size
+        if end > len(data):
+            return None
+        memo_header = DB4MemoHeader.unpack(data[pos:end])
+        if end + memo_header.length > len(data):
             return None
+        data = data[end:end + memo_header.length]
+        return data.split(b'\x1f', 1)[0]
 
-        # Todo: read this from the file header.
-        block_size = 512
+    def _read_memo(self, index):
+        if index <= 0:
+            return None
 
-        self._seek(index * block_size)
+        self._seek(index * self._blocksize)
         memo_header = DB4MemoHeader.read(self.file)
         data = self._read(memo_header.length)
         # Todo: fields are terminated in different ways.
@@ -172,12 +618,16 @@ def find_memofile(dbf_filename):
         return None
 
 
-def open_memofile(filename, dbversion):
-    if filename.lower().endswith('.fpt'):
-        return VFPMemoFile(filename)
+def open_memofile(filename, dbversion, use_mmap=False, cache=None,
+                  binary_memos='bytes', opener=None):
+    if strip_compression(filename).lower().endswith('.fpt'):
+        return VFPMemoFile(filename, use_mmap=use_mmap, cache=cache,
+                           binary_memos=binary_memos, opener=opener)
     else:
         # print('######', dbversion)
         if dbversion == 0x83:
-            return DB3MemoFile(filename)
+            return DB3MemoFile(filename, use_mmap=use_mmap, cache=cache,
+                               opener=opener)
         else:
-            return DB4MemoFile(filename)
+            return DB4MemoFile(filename, use_mmap=use_mmap, cache=cache,
+                               opener=opener)
@@ -0,0 +1,105 @@
+"""
+Memory mapped reading of files.
+
+A read only mmap object has the same read(), seek(), tell() and
+close() methods as a file object opened in binary mode, so it can be
+used wherever dbfread reads from a file. Reads and seeks become
+memory copies from the page cache instead of system calls, and
+processes that map the same file share one copy of it in memory.
+"""
+try:
+    import mmap
+except ImportError:
+    # Not available on all platforms.
+    mmap = None
+
+
+def open_mapped(filename):
+    """Open a file for reading as a memory map.
+
+    Falls back to a regular file object opened in binary mode if the
+    file can not be mapped, for example if it is empty or is not a
+    regular file.
+    """
+    if mmap is not None:
+        with open(filename, 'rb') as infile:
+            try:
+                return mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, EnvironmentError):
+                pass
+
+    return open(filename, 'rb')
+
+
+class BufferFile(object):
+    """Read only file-like object over a buffer.
+
+    Works like a read only mmap object for any object that supports
+    the buffer protocol (bytes, bytearray, memoryview, mmap or the
+    buffer of a BytesIO object). The buffer is not copied, only the
+    data that is read.
+    """
+    def __init__(self, data):
+        view = memoryview(data)
+        if view.ndim != 1 or view.itemsize != 1:
+            view = view.cast('B')
+        self.view = view
+        self._pos = 0
+
+    def read(self, size=-1):
+        start = self._pos
+        if size is None or size < 0:
+            end = len(self.view)
+        else:
+            end = min(start + size, len(self.view))
+        self._pos = max(start, end)
+        return self.view[start:end].tobytes()
+
+    def seek(self, pos, whence=0):
+        if whence == 1:
+            pos += self._pos
+        elif whence == 2:
+            pos += len(self.view)
+        self._pos = max(pos, 0)
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def close(self):
+        pass
+
+    def __len__(self):
+        return len(self.view)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice) and index.step not in (None, 1):
+            # Memoryviews in Python 2 can't be sliced with a step.
+            start, stop, step = index.indices(len(self.view))
+            if step > 0:
+                return self.view[start:stop].tobytes()[::step]
+            return self.view.tobytes()[index]
+        return self.view[index].tobytes()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        return False
+
+
+def is_mapped(fileobj):
+    """Return True if fileobj is a memory map (or a BufferFile)."""
+    return ((mmap is not None and isinstance(fileobj, mmap.mmap))
+            or isinstance(fileobj, BufferFile))
+
+
+def get_view(fileobj):
+    """Return a memoryview of a memory map or BufferFile."""
+    if isinstance(fileobj, BufferFile):
+        return fileobj.view
+    else:
+        return memoryview(fileobj)
+
+
+__all__ = ['open_mapped', 'is_mapped', 'get_view', 'BufferFile']
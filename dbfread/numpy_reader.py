@@ -0,0 +1,334 @@
+"""
+Read DBF tables into NumPy arrays.
+
+The record area of the file is viewed as a NumPy structured array
+with one field for the deletion flag and one for each DBF field.
+Deleted records are masked out and each column is then converted in
+one go instead of one value at a time.
+
+Field types that don't have a vectorized conversion (memos, flags and
+custom field types) are parsed one value at a time with the table's
+field parser. The same is done for field types where the parser class
+overrides the built in parse method.
+
+This module requires NumPy. It is only imported by DBF.to_numpy().
+"""
+import collections
+import numpy as np
+from .field_parser import FieldParser, _function
+
+# Offset from julian days (used in the file) to days since 1970-01-01.
+JULIAN_UNIX_EPOCH = 2440588
+
+MS_PER_DAY = 24 * 60 * 60 * 1000
+
+
+def _convert_C(table, field, column):
+    column = np.char.rstrip(column, b'\0 ')
+    return np.char.decode(column, table.encoding, table.char_decode_errors)
+
+
+def _convert_D(table, field, column):
+    # column is an array of 8 ASCII digits per value (YYYYMMDD).
+    digits = column.astype(np.int64) - ord('0')
+    null = np.all((column == ord(' ')) | (column == ord('0')), axis=1)
+    valid = np.all((digits >= 0) & (digits <= 9), axis=1)
+
+    weights = 10 ** np.arange(7, -1, -1, dtype=np.int64)
+    number = (np.where(null[:, np.newaxis], 0, digits) * weights).sum(axis=1)
+    year = number // 10000
+    month = number // 100 % 100
+    day = number % 100
+
+    valid &= (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1)
+    valid &= day <= 31
+
+    months = ((year - 1970).astype('datetime64[Y]').astype('datetime64[M]')
+              + (month - 1).astype('timedelta64[M]'))
+    dates = months.astype('datetime64[D]') + (day - 1).astype('timedelta64[D]')
+
+    # Days past the end of the month roll over into the next month
+    # (20200230 would be 2020-03-01). Those dates are invalid.
+    valid &= dates.astype('datetime64[M]') == months
+
+    invalid = ~(valid | null)
+    if np.any(invalid):
+        data = column[invalid][0].tobytes()
+        raise ValueError('invalid date {!r}'.format(data))
+
+    dates[null] = np.datetime64('NaT')
+    return dates
+
+
+def _convert_N(table, field, column):
+    if len(column) == 0:
+        # np.char functions fail on empty arrays in NumPy 2.
+        if field.decimal_count == 0:
+            return np.zeros(0, dtype=np.int64)
+        else:
+            return np.zeros(0, dtype=np.float64)
+
+    # In some files * is used for padding.
+    column = np.char.strip(column, b' *')
+    column = np.char.replace(column, b',', b'.')
+    empty = column == b''
+
+    if field.decimal_count == 0 and not np.any(empty):
+        try:
+            return column.astype(np.int64)
+        except (ValueError, OverflowError):
+            pass
+
+    values = np.full(len(column), np.nan)
+    values[~empty] = column[~empty].astype(np.float64)
+    return values
+
+
+def _convert_I(table, field, column):
+    return column.astype(np.int32)
+
+
+def _convert_O(table, field, column):
+    return column.astype(np.float64)
+
+
+def _convert_Y(table, field, column):
+    # Currency is stored as ten thousandths.
+    return column.astype(np.int64)
+
+
+def _convert_T(table, field, column):
+    day = column['day'].astype(np.int64)
+    msec = column['msec'].astype(np.int64)
+    values = ((day - JULIAN_UNIX_EPOCH) * MS_PER_DAY + msec)
+    values = values.astype('datetime64[ms]')
+
+    # Like parseT(), blank values and day 0 are None.
+    data = np.ascontiguousarray(column).view('u1').reshape(-1, 8)
+    blank = np.all(np.isin(data, np.frombuffer(b' \t\n\r\x0b\x0c',
+                                               dtype='u1')), axis=1)
+    values[(day == 0) | blank] = np.datetime64('NaT')
+    return values
+
+
+def _convert_L(table, field, column):
+    column = column.astype(np.uint8)
+
+    def isin(chars):
+        return np.isin(column, np.frombuffer(chars, dtype=np.uint8))
+
+    true = isin(b'TtYy')
+    false = isin(b'FfNn')
+    null = isin(b'? ')
+
+    invalid = ~(true | false | null)
+    if np.any(invalid):
+        message = 'Illegal value for logical field: {!r}'
+        raise ValueError(message.format(bytes(column[invalid][:1])))
+
+    return np.ma.MaskedArray(true, mask=null)
+
+
+# Vectorized conversions by field type: (numpy dtype, conversion)
+# The dtype is a function of the field since some depend on the length.
+_CONVERSIONS = {
+    'C': (lambda field: 'S{}'.format(field.length), _convert_C),
+    'V': (lambda field: 'S{}'.format(field.length), _convert_C),
+    'D': (lambda field: ('u1', (8,)), _convert_D),
+    'N': (lambda field: 'S{}'.format(field.length), _convert_N),
+    'F': (lambda field: 'S{}'.format(field.length), _convert_N),
+    'I': (lambda field: '<i4', _convert_I),
+    '+': (lambda field: '<i4', _convert_I),
+    'O': (lambda field: '<f8', _convert_O),
+    'B': (lambda field: '<f8', _convert_O),
+    'Y': (lambda field: '<i8', _convert_Y),
+    'T': (lambda field: [('day', '<u4'), ('msec', '<u4')], _convert_T),
+    '@': (lambda field: [('day', '<u4'), ('msec', '<u4')], _convert_T),
+    'L': (lambda field: 'u1', _convert_L),
+}
+
+# Field types which can only be viewed if they have this length.
+_LENGTHS = {
+    'D': 8,
+    'I': 4,
+    '+': 4,
+    'O': 8,
+    'B': 8,
+    'Y': 8,
+    'T': 8,
+    '@': 8,
+    'L': 1,
+}
+
+# The parse methods that the vectorized conversions replace.
+_BUILTIN_PARSERS = {
+    'C': FieldParser.parseC,
+    'V': FieldParser.parseV,
+    'D': FieldParser.parseD,
+    'N': FieldParser.parseN,
+    'F': FieldParser.parseF,
+    'I': FieldParser.parseI,
+    '+': FieldParser.parse2B,
+    'O': FieldParser.parseO,
+    'B': FieldParser.parseB,
+    'Y': FieldParser.parseY,
+    'T': FieldParser.parseT,
+    '@': FieldParser.parse40,
+    'L': FieldParser.parseL,
+}
+
+
+def _get_conversion(table, parser, field):
+    """Return (dtype, conversion) for a field or None if the field
+    must be parsed one value at a time."""
+    if table.raw or field.type not in _CONVERSIONS:
+        return None
+
+    if field.type == 'B' and parser.dbversion not in [0x30, 0x31, 0x32]:
+        # Binary memo.
+        return None
+
+    if field.length != _LENGTHS.get(field.type, field.length):
+        return None
+
+    func = _function(parser.get_parse_function(field))
+    if func is not _function(_BUILTIN_PARSERS[field.type]):
+        # Overridden in parser class.
+        return None
+
+    return _CONVERSIONS[field.type]
+
+
+def get_column_names(table, columns=None):
+    """Return the names of the fields to read.
+
+    This defaults to the fields selected for the table.
+    """
+    selected = [field.name for field in table._get_fields()]
+    if columns is None:
+        return selected
+
+    for name in columns:
+        if name not in selected:
+            raise ValueError('Unknown field: {!r}'.format(name))
+    return list(columns)
+
+
+def _read_records(table, dtype, start, stop):
+    """Return records from start to stop as a structured array."""
+    header = table.header
+
+    if stop <= start:
+        return np.zeros(0, dtype=dtype)
+    elif table._buffer is not None:
+        return np.frombuffer(table._buffer, dtype=dtype, count=stop - start,
+                             offset=header.headerlen
+                             + start * header.recordlen)
+    elif table._archive is None and table._fileobj is None:
+        return np.memmap(table.filename, dtype=dtype, mode='r',
+                         offset=header.headerlen + start * header.recordlen,
+                         shape=(stop - start,))
+    else:
+        with table._open() as infile:
+            infile.seek(header.headerlen + start * header.recordlen, 0)
+            data = infile.read((stop - start) * header.recordlen)
+        return np.frombuffer(data, dtype=dtype,
+                             count=len(data) // header.recordlen)
+
+
+def iter_numpy(table, columns=None, chunksize=None):
+    """Read the live records of a table into NumPy arrays in chunks.
+
+    Yields an ordered dictionary of field name to array for every
+    chunksize records in the file (live and deleted). If chunksize is
+    None all records are returned in one chunk. At least one chunk is
+    always returned.
+    """
+    table._check_seekable('reading columns')
+    columns = get_column_names(table, columns)
+
+    # Arrays hold the memo values, not views or streams.
+    with table._open_memofile(binary_memos='bytes') as memofile:
+        parser = table.parserclass(table, memofile)
+        parser.lazy_memos = False
+
+        names = ['flag']
+        formats = ['S1']
+        offsets = [0]
+        conversions = []
+        for i, (field, start, end) in enumerate(table._get_field_slices()):
+            if field.name not in columns:
+                continue
+
+            conversion = _get_conversion(table, parser, field)
+            if conversion is None:
+                dtype = 'V{}'.format(field.length)
+            else:
+                dtype = conversion[0](field)
+
+            names.append('f{}'.format(i))
+            formats.append(dtype)
+            offsets.append(start)
+            conversions.append((field, names[-1], conversion))
+
+        dtype = np.dtype({'names': names,
+                          'formats': formats,
+                          'offsets': offsets,
+                          'itemsize': table.header.recordlen})
+
+        numrecords = table._get_numrecords()
+        if chunksize is None:
+            chunksize = max(numrecords, 1)
+
+        for start in range(0, max(numrecords, 1), chunksize):
+            stop = min(start + chunksize, numrecords)
+            records = _read_records(table, dtype, start, stop)
+
+            flags = records['flag']
+            eof = np.flatnonzero(flags == b'\x1a')
+            if len(eof):
+                # End of records.
+                records = records[:eof[0]]
+                flags = flags[:eof[0]]
+            live = flags == b' '
+
+            match = table._get_predicate()
+            if match is not None:
+                # Test the filters on the raw records.
+                data = records.tobytes()
+                recordlen = table.header.recordlen
+                for i in np.flatnonzero(live):
+                    if not match(data, int(i) * recordlen):
+                        live[i] = False
+
+            arrays = collections.OrderedDict()
+            for field, name, conversion in conversions:
+                column = records[name][live]
+                if conversion is None:
+                    parse = parser.get_parse_function(field)
+                    if table.raw:
+                        values = [value.tobytes() for value in column]
+                    else:
+                        values = [parse(field, value.tobytes())
+                                  for value in column]
+                    array = np.empty(len(values), dtype=object)
+                    array[:] = values
+                else:
+                    array = conversion[1](table, field, column)
+                arrays[field.name] = array
+
+            # Keep the order asked for.
+            yield collections.OrderedDict((name, arrays[name])
+                                          for name in columns)
+
+            if len(eof):
+                break
+
+
+def read_numpy(table, columns=None):
+    """Read the live records of a table into NumPy arrays.
+
+    Returns an ordered dictionary of field name to array.
+    """
+    for arrays in iter_numpy(table, columns):
+        return arrays
@@ -0,0 +1,79 @@
+"""
+Read DBF tables into Pandas data frames.
+
+Columns are read with dbfread.numpy_reader and handed to Pandas as
+typed arrays, so no per record dictionaries are built and numeric and
+date columns don't end up as object columns.
+
+This module requires Pandas. It is only imported by DBF.DataFrame().
+"""
+import collections
+import numpy as np
+import pandas as pd
+from .numpy_reader import iter_numpy, get_column_names
+
+
+def _make_column(field, array, dtype, categorical, index):
+    if field.type == 'L':
+        # Masked for '?' and blank.
+        array = pd.arrays.BooleanArray(np.ma.getdata(array),
+                                       np.ma.getmaskarray(array))
+    elif field.type == 'Y':
+        # Ten thousandths.
+        array = array / 10000.0
+
+    if field.name in categorical:
+        array = pd.Categorical(array)
+
+    series = pd.Series(array, index=index, copy=False)
+    if field.name in dtype:
+        series = series.astype(dtype[field.name])
+    return series
+
+
+def iter_dataframes(table, columns=None, dtype=None, categorical=None,
+                    chunksize=None):
+    """Read live records into data frames.
+
+    Yields one data frame for every chunksize records in the file.
+    Chunks with no live records are skipped, but at least one frame
+    is always returned. The index continues from one frame to the
+    next.
+    """
+    columns = get_column_names(table, columns)
+    fields = dict((field.name, field) for field in table.fields)
+
+    if dtype is None:
+        dtype = {}
+    elif not isinstance(dtype, dict):
+        dtype = dict((name, dtype) for name in columns)
+
+    if categorical is None:
+        categorical = ()
+
+    start = 0
+    empty = None
+    for arrays in iter_numpy(table, columns, chunksize):
+        length = max([len(array) for array in arrays.values()] + [0])
+        index = pd.RangeIndex(start, start + length)
+
+        data = collections.OrderedDict()
+        for name, array in arrays.items():
+            data[name] = _make_column(fields[name], array,
+                                      dtype, categorical, index)
+        frame = pd.DataFrame(data, index=index, columns=list(arrays))
+
+        if length:
+            yield frame
+            start += length
+        elif start == 0 and empty is None:
+            empty = frame
+
+    if start == 0:
+        yield empty
+
+
+def read_dataframe(table, columns=None, dtype=None, categorical=None):
+    """Read live records into a data frame."""
+    for frame in iter_dataframes(table, columns, dtype, categorical):
+        return frame
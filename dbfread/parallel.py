@@ -0,0 +1,57 @@
+"""
+Reading tables in several processes.
+
+Records have a fixed length, so a table can be split into ranges of
+record indexes which are read independently. Each range is described
+by a DBFHandle which is sent to a worker process. The worker opens
+its own DBF and memo file from the handle (without reading the
+headers again), seeks to the first record in the range and decodes
+the records there.
+"""
+import multiprocessing
+
+# Aim for this many ranges per worker so that workers that get
+# ranges with cheap records don't sit idle at the end.
+RANGES_PER_WORKER = 4
+
+
+def _read_range(task):
+    handle, func = task
+
+    records = handle.iter_records()
+    if func is None:
+        return list(records)
+    else:
+        return [func(record) for record in records]
+
+
+def parallel_scan(table, func=None, workers=None, ordered=True,
+                  chunksize=None):
+    """Read live records in a pool of worker processes.
+
+    Yields records (or func(record) if func is passed).
+    """
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+
+    handle = table.get_handle()
+    if chunksize is None:
+        chunksize = max(handle.numrecords // (workers * RANGES_PER_WORKER), 1)
+
+    tasks = [(part, func) for part in handle.split(chunksize)]
+
+    pool = multiprocessing.Pool(workers)
+    try:
+        if ordered:
+            results = pool.imap(_read_range, tasks)
+        else:
+            results = pool.imap_unordered(_read_range, tasks)
+
+        for values in results:
+            for value in values:
+                yield value
+
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
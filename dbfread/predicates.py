@@ -0,0 +1,172 @@
+"""
+Record filters that are evaluated on the raw record data.
+
+A predicate is a function that takes a block of records and the
+offset of a record in the block and returns True if the record
+matches. Only the field that is tested is looked at, so records that
+don't match are skipped without being parsed.
+
+Values are compared in a form that is cheap to get from the raw data:
+
+  C, V  the encoded bytes with trailing spaces and b'\\0' removed
+  D     the raw 'YYYYMMDD' bytes, which sort the same way as dates
+  N, F  int or float
+  I, +  int
+
+Other field types (except memos) are compared after parsing the
+field with the table's field parser.
+"""
+import struct
+import operator
+
+
+def _none_safe(op):
+    # Empty values (None) never match a range.
+    def test(value, target):
+        return value is not None and op(value, target)
+    return test
+
+
+OPERATORS = {
+    'eq': operator.eq,
+    'ne': operator.ne,
+    'lt': _none_safe(operator.lt),
+    'le': _none_safe(operator.le),
+    'gt': _none_safe(operator.gt),
+    'ge': _none_safe(operator.ge),
+    'isin': lambda value, targets: value in targets,
+}
+
+
+def _find_field(table, name):
+    start = 1
+    for field in table.fields:
+        if field.name == name:
+            return field, start, start + field.length
+        start += field.length
+
+    raise ValueError('Unknown field: {!r}'.format(name))
+
+
+def _make_key(table, field, start, end):
+    """Return (key, convert).
+
+    key(block, offset) returns the value of the field in comparable
+    form and convert(value) converts a value given by the user to the
+    same form.
+    """
+    ftype = field.type
+
+    if ftype in 'CV':
+        def key(block, offset):
+            return block[offset + start:offset + end].rstrip(b'\0 ')
+
+        def convert(value):
+            if not isinstance(value, bytes):
+                value = value.encode(table.encoding)
+            return value.rstrip(b'\0 ')
+
+    elif ftype == 'D':
+        def key(block, offset):
+            data = block[offset + start:offset + end]
+            if data.strip(b' 0') == b'':
+                return None
+            return data
+
+        def convert(value):
+            if value is None:
+                return None
+            return '{:04d}{:02d}{:02d}'.format(
+                value.year, value.month, value.day).encode('ascii')
+
+    elif ftype in 'NF':
+        def key(block, offset):
+            # In some files * is used for padding.
+            data = block[offset + start:offset + end].strip().strip(b'*')
+            if not data:
+                return None
+            try:
+                return int(data)
+            except ValueError:
+                return float(data.replace(b',', b'.'))
+
+        convert = None
+
+    elif ftype in 'I+' and field.length == 4:
+        unpack_from = struct.Struct('<i').unpack_from
+
+        def key(block, offset):
+            return unpack_from(block, offset + start)[0]
+
+        convert = None
+
+    elif ftype in 'MGP' or (ftype == 'B' and table.header.dbversion
+                            not in [0x30, 0x31, 0x32]):
+        raise ValueError("can't filter on memo field {!r}".format(field.name))
+
+    else:
+        parse = table.parserclass(table).get_parse_function(field)
+
+        def key(block, offset):
+            return parse(field, block[offset + start:offset + end])
+
+        convert = None
+
+    return key, convert
+
+
+def make_predicate(table, name, **conditions):
+    """Create a predicate for a field.
+
+    conditions are operator names (eq, ne, lt, le, gt, ge, isin) and
+    the values to compare with. All conditions must be true for a
+    record to match.
+    """
+    if not conditions:
+        raise ValueError('no conditions given for field {!r}'.format(name))
+
+    field, start, end = _find_field(table, name)
+    key, convert = _make_key(table, field, start, end)
+    if convert is None:
+        convert = lambda value: value
+
+    tests = []
+    for opname, target in sorted(conditions.items()):
+        try:
+            test = OPERATORS[opname]
+        except KeyError:
+            raise ValueError('Unknown operator: {!r}'.format(opname))
+
+        if opname == 'isin':
+            target = frozenset(convert(value) for value in target)
+        else:
+            target = convert(target)
+        tests.append((test, target))
+
+    def predicate(block, offset):
+        value = key(block, offset)
+        for test, target in tests:
+            if not test(value, target):
+                return False
+        return True
+
+    return predicate
+
+
+def combine_predicates(predicates):
+    """Combine a list of predicates into one.
+
+    Returns None if the list is empty.
+    """
+    if not predicates:
+        return None
+    elif len(predicates) == 1:
+        return predicates[0]
+
+    def predicate(block, offset):
+        for match in predicates:
+            if not match(block, offset):
+                return False
+        return True
+
+    return predicate
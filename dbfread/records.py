@@ -0,0 +1,167 @@
+"""
+Compact record types.
+
+Records are normally ordered dictionaries, which store the field names
+again in every record. These record types only store the values:
+
+  'tuple'       plain tuples in the order of table.record_names
+  'namedtuple'  a namedtuple class made for the table
+  'slots'       a class with __slots__ made for the table, with both
+                attribute (record.NAME) and key (record['NAME']) access
+
+Classes are made once for each list of field names and are shared by
+all tables with the same fields. Records pickle as the field names and
+values, so they can be sent to other processes where the class is
+made again.
+"""
+import re
+import keyword
+import collections
+
+RECORD_TYPES = ['tuple', 'namedtuple', 'slots']
+
+_classes = {}
+
+
+def _make_attribute_names(names, reserved=()):
+    """Return valid and unique attribute names for field names.
+
+    Names that are not valid identifiers or are in reserved are
+    replaced by _0, _1, etc. (by position) like
+    namedtuple(rename=True) does.
+    """
+    attrs = []
+    seen = set()
+    for i, name in enumerate(names):
+        if (not re.match(r'^[A-Za-z][A-Za-z0-9_]*$', name)
+                or keyword.iskeyword(name) or name in reserved
+                or name in seen):
+            name = '_{}'.format(i)
+        seen.add(name)
+        attrs.append(name)
+    return attrs
+
+
+class SlotsRecord(object):
+    """Base class for 'slots' records."""
+    __slots__ = []
+
+    # Set in subclasses.
+    _fields = ()
+    _attrs = ()
+    _index = {}
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return getattr(self, self._attrs[key])
+        try:
+            return getattr(self, self._index[key])
+        except KeyError:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def keys(self):
+        return list(self._fields)
+
+    def values(self):
+        return [getattr(self, attr) for attr in self._attrs]
+
+    def items(self):
+        return list(zip(self._fields, self.values()))
+
+    def _asdict(self):
+        return collections.OrderedDict(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, SlotsRecord):
+            return self.items() == other.items()
+        elif isinstance(other, dict):
+            return dict(self.items()) == other
+        else:
+            return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = None
+
+    def __reduce__(self):
+        return (_rebuild, ('slots', self._fields, tuple(self.values())))
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, ', '.join(
+            '{}={!r}'.format(name, value) for name, value in self.items()))
+
+
+def _make_slots_class(names):
+    # Fields named like methods (keys, get, ...) would hide them.
+    attrs = _make_attribute_names(names, reserved=set(dir(SlotsRecord)))
+    args = ', '.join('v{}'.format(i) for i in range(len(attrs)))
+    lines = ['def __init__(self{}):'.format(', ' + args if args else '')]
+    for i, attr in enumerate(attrs):
+        lines.append('    self.{} = v{}'.format(attr, i))
+    if not attrs:
+        lines.append('    pass')
+
+    namespace = {}
+    exec('\n'.join(lines) + '\n', namespace)
+
+    return type('Record', (SlotsRecord,), {
+        '__slots__': attrs,
+        '__init__': namespace['__init__'],
+        '_fields': tuple(names),
+        '_attrs': tuple(attrs),
+        '_index': dict(zip(names, attrs)),
+    })
+
+
+def _make_namedtuple_class(names):
+    # namedtuple() only accepts the _0, _1 names with rename=True.
+    base = collections.namedtuple('Record', _make_attribute_names(names),
+                                  rename=True)
+
+    def __reduce__(self):
+        return (_rebuild, ('namedtuple', names, tuple(self)))
+
+    return type('Record', (base,), {'__slots__': (),
+                                    '__reduce__': __reduce__})
+
+
+def make_record_class(record_type, names):
+    """Return the record class for a list of field names.
+
+    record_type is 'namedtuple' or 'slots'. The arguments to the class
+    are the values in the order of the names.
+    """
+    names = tuple(names)
+    key = (record_type, names)
+    if key not in _classes:
+        if record_type == 'namedtuple':
+            _classes[key] = _make_namedtuple_class(names)
+        elif record_type == 'slots':
+            _classes[key] = _make_slots_class(names)
+        else:
+            raise ValueError('unknown record type {!r}'.format(record_type))
+    return _classes[key]
+
+
+def _rebuild(record_type, names, values):
+    # Used to unpickle records.
+    return make_record_class(record_type, names)(*values)
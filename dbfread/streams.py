@@ -0,0 +1,220 @@
+"""
+Reading tables from compressed files and non-seekable streams.
+
+Compressed files (.gz, .bz2, .xz and .zst) and file objects like pipes
+can't be read with random access. Records are instead read from start
+to end in large blocks, and deleted records are skipped by reading
+past them. Operations that need to seek (len(), indexing, the column
+readers and parallel reading) raise io.UnsupportedOperation.
+"""
+import io
+import os
+from .ifiles import ifind
+
+# Compression modules by file name extension. zstd needs the
+# zstandard package.
+COMPRESSIONS = {
+    '.gz': 'gzip',
+    '.bz2': 'bz2',
+    '.xz': 'lzma',
+    '.lzma': 'lzma',
+    '.zst': 'zstd',
+    '.zstd': 'zstd',
+}
+
+
+def get_compression(filename):
+    """Return the compression of a file name or None."""
+    ext = os.path.splitext(filename)[1].lower()
+    return COMPRESSIONS.get(ext)
+
+
+def strip_compression(filename):
+    """Remove the compression extension from a file name."""
+    if get_compression(filename):
+        return os.path.splitext(filename)[0]
+    else:
+        return filename
+
+
+def open_compressed(filename):
+    """Open a compressed file for reading.
+
+    Returns a binary file object with the uncompressed data.
+    """
+    compression = get_compression(filename)
+    if compression == 'gzip':
+        import gzip
+        return gzip.open(filename, 'rb')
+    elif compression == 'bz2':
+        import bz2
+        return bz2.BZ2File(filename, 'rb')
+    elif compression == 'lzma':
+        import lzma
+        return lzma.open(filename, 'rb')
+    elif compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError('the zstandard package is needed to read'
+                              ' {!r}'.format(filename))
+        infile = open(filename, 'rb')
+        return zstandard.ZstdDecompressor().stream_reader(infile,
+                                                          closefd=True)
+    else:
+        raise ValueError('unknown compression: {!r}'.format(filename))
+
+
+def find_compressed_memofile(dbf_filename):
+    """Find the memo file for a compressed DBF file.
+
+    The memo file can be uncompressed or have the same compression as
+    the DBF file. Returns None if not found.
+    """
+    base = strip_compression(dbf_filename)
+    for ext in ['.fpt', '.dbt']:
+        name = ifind(base, ext=ext)
+        if name:
+            return name
+
+        name = ifind(os.path.splitext(base)[0] + ext
+                     + os.path.splitext(dbf_filename)[1])
+        if name:
+            return name
+    return None
+
+
+def open_memo_data(filename, use_mmap=False):
+    """Decompress a memo file into memory.
+
+    Memo files are read with random access, so they can't be
+    streamed.
+    """
+    with open_compressed(filename) as infile:
+        return io.BytesIO(infile.read())
+
+
+def is_seekable(fileobj):
+    """Return True if a file object supports seek()."""
+    seekable = getattr(fileobj, 'seekable', None)
+    if seekable is None:
+        # Python 2 files have no seekable(), so try seeking to where
+        # the file already is. This fails for pipes.
+        try:
+            fileobj.seek(fileobj.tell())
+        except (AttributeError, IOError, OSError, ValueError):
+            return False
+        return True
+    try:
+        return bool(seekable())
+    except ValueError:
+        # Closed file.
+        return False
+
+
+class OffsetFile(object):
+    """Reads a seekable file object that the table starts in at offset.
+
+    Positions are relative to the offset. Each OffsetFile keeps its
+    own position so several of them can read the same file object in
+    turn. close() leaves the file object open.
+    """
+    def __init__(self, fileobj, offset=0):
+        self.fileobj = fileobj
+        self.offset = offset
+        self._pos = 0
+
+    def read(self, size=-1):
+        self.fileobj.seek(self.offset + self._pos)
+        if size is None or size < 0:
+            data = self.fileobj.read()
+        else:
+            data = self.fileobj.read(size)
+        self._pos += len(data)
+        return data
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, pos, whence=0):
+        if whence == 1:
+            pos += self._pos
+        elif whence == 2:
+            self.fileobj.seek(0, 2)
+            pos += self.fileobj.tell() - self.offset
+        self._pos = max(pos, 0)
+        return self._pos
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        return False
+
+
+class ForwardReader(object):
+    """Wraps a file object that can only be read from start to end.
+
+    read(n) always returns n bytes unless the end of the file is
+    reached, and seek() can only skip forward, which is done by
+    reading.
+    """
+    def __init__(self, fileobj, close=True):
+        self.fileobj = fileobj
+        self._close = close
+        self._pos = 0
+
+    def read(self, size=-1):
+        read = self.fileobj.read
+        if size is None or size < 0:
+            data = read()
+        else:
+            data = read(size)
+            if 0 < len(data) < size:
+                # Short read from a pipe or raw file.
+                chunks = [data]
+                size -= len(data)
+                while size > 0:
+                    chunk = read(size)
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+                    size -= len(chunk)
+                data = b''.join(chunks)
+        self._pos += len(data)
+        return data
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, pos, whence=0):
+        if whence == 1:
+            pos += self._pos
+        elif whence != 0:
+            raise io.UnsupportedOperation('can only seek forward in'
+                                          ' a stream')
+        if pos < self._pos:
+            raise io.UnsupportedOperation('can not seek backward in'
+                                          ' a stream')
+
+        remaining = pos - self._pos
+        while remaining > 0:
+            data = self.read(min(remaining, 1024 * 1024))
+            if not data:
+                break
+            remaining -= len(data)
+        return self._pos
+
+    def close(self):
+        if self._close:
+            self.fileobj.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+        return False
@@ -0,0 +1,37 @@
+import asyncio
+from .dbf import DBF
+
+def run(coroutine):
+    return asyncio.new_event_loop().run_until_complete(coroutine)
+
+async def collect(iterator):
+    records = []
+    async with iterator:
+        async for record in iterator:
+            records.append(record)
+    return records
+
+def test_aiter():
+    table = DBF('testcases/memotest.dbf')
+    for batch_size in [1, 2, 3]:
+        records = run(collect(table.aiter(batch_size=batch_size)))
+        assert records == list(table)
+
+    assert run(collect(table.aiter(deleted=True))) == list(table.deleted)
+
+def test_aiter_close():
+    table = DBF('testcases/memotest.dbf')
+
+    async def first():
+        async with table.aiter(batch_size=1) as records:
+            async for record in records:
+                return record
+
+    assert run(first()) == table.records[0]
+
+def test_aload():
+    table = DBF('testcases/memotest.dbf')
+    run(table.aload(batch_size=1))
+    assert table.loaded
+    assert table.records == list(DBF('testcases/memotest.dbf'))
+    assert table.deleted == list(DBF('testcases/memotest.dbf').deleted)
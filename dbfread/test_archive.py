@@ -0,0 +1,52 @@
+import zipfile
+from pytest import raises
+from .dbf import DBF
+from .exceptions import DBFNotFound
+
+def make_zip(tmpdir, names):
+    path = str(tmpdir.join('tables.zip'))
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name in names:
+            archive.write('testcases/' + name, 'data/' + name)
+    return path
+
+def test_zip(tmpdir):
+    path = make_zip(tmpdir, ['memotest.dbf', 'memotest.FPT'])
+    expected = list(DBF('testcases/memotest.dbf'))
+
+    for spill in [None, 'memory', 'tempfile']:
+        with DBF(path, spill=spill) as table:
+            assert table.member == 'data/memotest.dbf'
+            assert table.memofilename == 'data/memotest.FPT'
+            assert table.name == 'memotest'
+            assert list(table) == expected
+            # Read again with the same archive handle.
+            assert list(table) == expected
+            assert len(table) == 2
+            assert table.records[1] == expected[1]
+
+def test_zip_member(tmpdir):
+    path = make_zip(tmpdir, ['memotest.dbf', 'memotest.FPT',
+                             'no_memofile.dbf'])
+
+    with raises(ValueError):
+        DBF(path)
+
+    with raises(DBFNotFound):
+        DBF(path, member='missing.dbf')
+
+    table = DBF(path, member='DATA/MEMOTEST.DBF')
+    assert table.member == 'data/memotest.dbf'
+    assert len(list(table)) == 2
+    table.close()
+
+def test_zip_copies_share_archive(tmpdir):
+    path = make_zip(tmpdir, ['memotest.dbf', 'memotest.FPT'])
+
+    with DBF(path) as table:
+        with table.where('NAME', eq='Bob') as bob:
+            assert [r['NAME'] for r in bob] == [u'Bob']
+        with table.select('NAME') as names:
+            assert len(list(names)) == 2
+        # Closing the copies didn't close the archive.
+        assert len(list(table)) == 2
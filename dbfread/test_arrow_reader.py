@@ -0,0 +1,78 @@
+import datetime
+from decimal import Decimal
+from pytest import importorskip
+from .dbf import DBF
+from .test_read_and_length import make_dbf
+
+pa = importorskip('pyarrow')
+np = importorskip('numpy')
+from .arrow_reader import _currency_array, _make_array
+
+def test_arrow_batches():
+    table = DBF('testcases/memotest.dbf')
+    batches = list(table.iter_arrow_batches(batch_size=1))
+
+    # The last record is deleted so there are only two batches.
+    assert len(batches) == 2
+    schema = batches[0].schema
+    assert schema.field('NAME').type == pa.string()
+    assert schema.field('BIRTHDATE').type == pa.date32()
+
+    rows = pa.Table.from_batches(batches).to_pylist()
+    assert rows[1] == {u'NAME': u'Bob',
+                       u'BIRTHDATE': datetime.date(1980, 11, 12),
+                       u'MEMO': u'Bob memo'}
+
+def test_currency_array():
+    array = _currency_array(np.array([125000, -1, 0]))
+    assert array.to_pylist() == [Decimal('12.5'), Decimal('-0.0001'), 0]
+
+def test_parquet_and_feather(tmpdir):
+    pq = importorskip('pyarrow.parquet')
+    feather = importorskip('pyarrow.feather')
+    table = DBF('testcases/memotest.dbf')
+
+    filename = str(tmpdir.join('memotest.parquet'))
+    table.to_parquet(filename)
+    assert pq.read_table(filename).column('NAME').to_pylist() == [
+        u'Alice', u'Bob']
+
+    filename = str(tmpdir.join('memotest.feather'))
+    table.to_feather(filename, dictionary=['NAME'])
+    assert feather.read_table(filename).column('NAME').to_pylist() == [
+        u'Alice', u'Bob']
+
+def test_feather_dictionary_batches(tmpdir):
+    feather = importorskip('pyarrow.feather')
+    fields = [('C', 'C', 3, 0)]
+    records = [b'abc', b'def', b'abc', b'   ', b'ghi']
+    table = DBF.from_buffer(make_dbf(fields, records))
+
+    # Each batch has its own dictionary.
+    filename = str(tmpdir.join('dictionary.feather'))
+    table.to_feather(filename, batch_size=2, dictionary=['C'])
+    column = feather.read_table(filename).column('C')
+    assert column.type == pa.dictionary(pa.int32(), pa.string())
+    assert column.to_pylist() == [u'abc', u'def', u'abc', u'', u'ghi']
+
+def test_non_integer_numeric():
+    array = _make_array(np.array([1.0, np.nan]), pa.int64())
+    assert array.type == pa.int64()
+    assert array.to_pylist() == [1, None]
+
+    array = _make_array(np.array([1.5, np.nan]), pa.int64())
+    assert array.type == pa.float64()
+    assert array.to_pylist() == [1.5, None]
+
+    # N fields without decimals can hold values like 1.5.
+    data = make_dbf([('N', 'N', 5, 0)], [b'    1', b'  1.5', b'     '])
+    batches = list(DBF.from_buffer(data).iter_arrow_batches())
+    assert batches[0].schema.field('N').type == pa.float64()
+    assert batches[0].column(0).to_pylist() == [1, 1.5, None]
+
+def test_empty_first_batch():
+    from .test_numpy_reader import make_deleted_first_table
+    table = make_deleted_first_table()
+    batches = list(table.iter_arrow_batches(batch_size=1))
+    assert [batch.num_rows for batch in batches] == [1]
+    assert batches[0].column(1).to_pylist() == [22]
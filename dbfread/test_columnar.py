@@ -0,0 +1,71 @@
+import pickle
+import datetime
+import collections
+from pytest import raises
+from .dbf import DBF
+from .columnar import ArrayColumn, DictColumn, ColumnarRecords
+
+Field = collections.namedtuple('Field', 'name type decimal_count')
+
+def test_load_columnar():
+    expected = DBF('testcases/memotest.dbf', load=True)
+
+    table = DBF('testcases/memotest.dbf')
+    table.load(storage='columnar')
+    assert table.storage == 'columnar'
+    assert isinstance(table.records, ColumnarRecords)
+    assert table.records == expected.records
+    assert table.deleted == expected.deleted
+    assert list(table) == list(expected)
+    assert len(table) == 2
+    assert table.records[-1] == expected.records[-1]
+    assert table.records[0]['NAME'] == u'Alice'
+    assert list(table.records.column('NAME')) == [u'Alice', u'Bob']
+
+    # Rows pickle as plain records.
+    row = pickle.loads(pickle.dumps(table.records[1]))
+    assert row == expected.records[1]
+    assert isinstance(row, collections.OrderedDict)
+
+    # Copies are loaded the same way.
+    assert table.select('NAME').storage == 'columnar'
+
+    with raises(ValueError):
+        DBF('testcases/memotest.dbf').load(storage='rows')
+
+def test_columns():
+    records = ColumnarRecords([Field('N', 'N', 0),
+                               Field('D', 'D', 0),
+                               Field('T', 'T', 0),
+                               Field('C', 'C', 0)], 0x03)
+    values = [
+        (1, datetime.date(2000, 1, 2),
+         datetime.datetime(2000, 1, 2, 3, 4, 5, 6), u'a'),
+        (None, None, None, None),
+        (2, datetime.date(1, 1, 1), datetime.datetime(9999, 12, 31), u'a'),
+    ]
+    for record in values:
+        records.append(record)
+    records.freeze()
+
+    assert [tuple(row.values()) for row in records] == values
+    assert isinstance(records.column('N'), ArrayColumn)
+    assert isinstance(records.column('C'), DictColumn)
+    assert records.column('C').values == [u'a', None]
+
+def test_fallback_to_list():
+    records = ColumnarRecords([Field('N', 'N', 0), Field('L', 'L', 0)], 0x03)
+    records.append((1, True))
+    records.append((1.5, 1))
+    assert records.column('N') == [1, 1.5]
+    assert records.column('L') == [True, 1]
+    assert type(records[1]['L']) is int
+
+def test_dict_column_widens_codes():
+    column = DictColumn()
+    for i in range(70000):
+        column.append(i % 300 if i < 1000 else i)
+    assert column.codes.itemsize >= 4
+    assert column[299] == 299
+    assert column[300] == 0
+    assert column[69999] == 69999
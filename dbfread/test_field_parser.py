@@ -178,3 +178,19 @@ def test_hex_field():
     field = MockField('?')
 
     parser.parse(field, b'test')
+
+def test_get_parse_function():
+    parser = FieldParser(MockDBF())
+    assert parser.get_parse_function(MockField('C')) == parser.parseC
+    assert parser.get_parse_function(MockField('+')) == parser.parse2B
+
+    with raises(ValueError):
+        parser.get_parse_function(MockField('?'))
+
+    # An overridden parse() must be called for every field.
+    class MyFieldParser(FieldParser):
+        def parse(self, field, data):
+            return 'parsed'
+
+    parser = MyFieldParser(MockDBF())
+    assert parser.get_parse_function(MockField('C')) == parser.parse
@@ -0,0 +1,45 @@
+from pytest import importorskip
+from .dbf import DBF
+from .exceptions import MissingMemoFile
+from .many import open_many
+from .test_streams import compress
+
+importorskip('concurrent.futures')
+
+def count_records(table):
+    return sum(1 for record in table)
+
+def test_open_many():
+    results = dict((result.filename, result)
+                   for result in open_many('testcases', func=len, workers=2))
+
+    result = results['testcases/memotest.dbf']
+    assert result.error is None
+    assert result.value == 2
+    assert result.table.memofilename == 'testcases/memotest.FPT'
+
+    result = results['testcases/no_memofile.dbf']
+    assert isinstance(result.error, MissingMemoFile)
+    assert result.table is None
+
+def test_open_many_options():
+    results = list(open_many(['testcases/*.dbf'],
+                             ignore_missing_memofile=True))
+    assert sorted(result.filename for result in results) == [
+        'testcases/memotest.dbf', 'testcases/no_memofile.dbf']
+    assert all(result.error is None for result in results)
+
+def test_memofilename():
+    table = DBF('testcases/no_memofile.dbf',
+                memofilename='testcases/memotest.FPT')
+    assert table.memofilename == 'testcases/memotest.FPT'
+
+def test_open_many_compressed_process(tmpdir):
+    path = compress(tmpdir, 'memotest.dbf')
+    compress(tmpdir, 'memotest.FPT')
+
+    for executor in ['thread', 'process']:
+        [result] = open_many(path, func=count_records, executor=executor)
+        assert result.error is None
+        assert result.value == 2
+        assert list(result.table) == list(DBF('testcases/memotest.dbf'))
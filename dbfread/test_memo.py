@@ -1,6 +1,10 @@
+import pickle
+import struct
 from pytest import raises
 from .dbf import DBF
 from .exceptions import MissingMemoFile
+from .memo import (MemoCache, LazyMemo, VFPMemoFile, DB3MemoFile,
+                   DB4MemoFile, PictureMemo)
 
 def test_missing_memofile():
     with raises(MissingMemoFile):
@@ -12,3 +16,139 @@ def test_missing_memofile():
     # Memo fields should be returned as None.
     record = next(iter(table))
     assert record['MEMO'] is None
+
+def test_columns_without_memo():
+    # The memo file is not needed if no memo field is selected.
+    table = DBF('testcases/no_memofile.dbf', columns=['NAME'])
+    assert table.memofilename is None
+    assert list(table)[0] == {u'NAME': u'Alice'}
+
+    with raises(MissingMemoFile):
+        table.select('NAME', 'MEMO')
+
+def test_memo_cache():
+    table = DBF('testcases/memotest.dbf', memo_cache_size=1024)
+    records = list(table)
+    assert table.memo_cache.misses == 2
+    assert table.memo_cache.hits == 0
+
+    assert list(table) == records
+    assert table.memo_cache.hits == 2
+    assert table.memo_cache.size == sum(len(record['MEMO'].encode('ascii'))
+                                        for record in records)
+
+def test_memo_cache_eviction():
+    cache = MemoCache(10)
+    cache.put(1, b'12345')
+    cache.put(2, b'12345')
+    assert cache.get(1) == b'12345'
+    cache.put(3, b'123')
+    assert cache.evictions == 1
+    assert cache.get(2) is None
+    assert cache.stats()['size'] == 8
+
+    # Too large to cache.
+    cache.put(4, b'12345678901')
+    assert cache.get(4) is None
+
+def test_lazy_memos():
+    table = DBF('testcases/memotest.dbf', lazy_memos=True)
+    expected = list(DBF('testcases/memotest.dbf'))
+    records = list(table)
+
+    memo = records[0]['MEMO']
+    assert isinstance(memo, LazyMemo)
+    assert not memo.loaded
+    assert memo == expected[0]['MEMO']
+    assert memo.loaded
+    assert len(memo) == len(expected[0]['MEMO'])
+    assert str(memo) == expected[0]['MEMO']
+    assert bytes(memo) == expected[0]['MEMO'].encode(table.encoding)
+    assert pickle.loads(pickle.dumps(records[1]['MEMO'])) == \
+        expected[1]['MEMO']
+
+    # The memo file is opened once for all lazy memos.
+    memofile = table._lazy_memofile
+    assert records[1]['MEMO'] == expected[1]['MEMO']
+    assert table._lazy_memofile is memofile
+    table.close()
+    assert table._lazy_memofile is None
+
+def test_lazy_memos_missing_memofile():
+    table = DBF('testcases/no_memofile.dbf', lazy_memos=True,
+                ignore_missing_memofile=True)
+    eager = DBF('testcases/no_memofile.dbf', ignore_missing_memofile=True)
+    assert list(table) == list(eager)
+    assert [record['MEMO'] for record in table] == [None, None]
+
+def test_prefetch():
+    with VFPMemoFile('testcases/memotest.FPT') as memofile:
+        expected = [memofile._read_memo(index) for index in [1, 2]]
+
+        memofile.prefetch([2, 1, 0, 2])
+        assert sorted(memofile._prefetched) == [1, 2]
+        assert [memofile[1], memofile[2]] == expected
+        assert type(memofile[1]) is type(expected[0])
+
+def test_prefetch_scan():
+    expected = list(DBF('testcases/memotest.dbf', mmap=True))
+    assert list(DBF('testcases/memotest.dbf')) == expected
+
+def _write_blocks(path, blocks, blocksize):
+    with open(str(path), 'wb') as outfile:
+        for block in blocks:
+            outfile.write(block.ljust(blocksize, b'\0'))
+
+def test_db3_memofile(tmpdir):
+    path = tmpdir.join('test.dbt')
+    long_memo = b'x' * 700
+    _write_blocks(path, [b'', b'hello\x1a\x1a', long_memo[:512],
+                         long_memo[512:] + b'\x1a\x1a'], 512)
+
+    with DB3MemoFile(str(path)) as memofile:
+        assert memofile[1] == b'hello'
+        assert memofile[2] == long_memo
+
+        memofile.index = memofile.build_index()
+        assert memofile[1] == b'hello'
+        assert memofile[2] == long_memo
+
+def test_db4_blocksize(tmpdir):
+    path = tmpdir.join('test.dbt')
+    header = struct.pack('<LL8sLH', 3, 0, b'test', 0, 64)
+    memo = struct.pack('<LL', 0x0808ffff, 5) + b'hello'
+    _write_blocks(path, [header, memo], 64)
+
+    with DB4MemoFile(str(path)) as memofile:
+        assert memofile[1] == b'hello'
+
+def _write_fpt(path, memos, blocksize=64):
+    header = struct.pack('>LHH504s', len(memos) + 9, 0, blocksize, b'')
+    blocks = [header[i:i + blocksize] for i in range(0, 512, blocksize)]
+    for memo_type, data in memos:
+        blocks.append(struct.pack('>LL', memo_type, len(data)) + data)
+    _write_blocks(path, blocks, blocksize)
+
+def test_binary_memos(tmpdir):
+    path = str(tmpdir.join('test.fpt'))
+    _write_fpt(path, [(0, b'picture'), (1, b'text')])
+
+    with VFPMemoFile(path, binary_memos='memoryview') as memofile:
+        view = memofile[8]
+        assert isinstance(view, memoryview)
+        assert view.tobytes() == b'picture'
+        assert memofile[9] == b'text'
+    # The view is still valid after the file is closed.
+    assert view.tobytes() == b'picture'
+    if hasattr(view, 'release'):
+        # Python 3.2 and later.
+        view.release()
+
+    with VFPMemoFile(path, binary_memos='stream') as memofile:
+        stream = memofile[8]
+        assert stream.memo_type is PictureMemo
+        assert stream.read(3) == b'pic'
+        assert stream.read() == b'ture'
+        stream.seek(0)
+        assert stream.read() == b'picture'
+        stream.close()
@@ -0,0 +1,93 @@
+import datetime
+from pytest import importorskip, raises
+from .dbf import DBF
+from .field_parser import FieldParser
+from .test_field_parser import MockDBF, MockField
+from .test_read_and_length import make_dbf
+
+np = importorskip('numpy')
+from .numpy_reader import (_convert_D, _convert_L, _convert_N, _convert_T,
+                           iter_numpy)
+
+def test_to_numpy():
+    arrays = DBF('testcases/memotest.dbf').to_numpy()
+    assert list(arrays) == ['NAME', 'BIRTHDATE', 'MEMO']
+    assert list(arrays['NAME']) == [u'Alice', u'Bob']
+    assert list(arrays['BIRTHDATE'].astype(object)) == [
+        datetime.date(1987, 3, 1), datetime.date(1980, 11, 12)]
+    assert list(arrays['MEMO']) == [u'Alice memo', u'Bob memo']
+
+    arrays = DBF('testcases/memotest.dbf').to_numpy(columns=['MEMO'])
+    assert list(arrays) == ['MEMO']
+
+def test_D():
+    column = np.frombuffer(b'19700101        00000000',
+                           dtype='u1').reshape(-1, 8)
+    dates = _convert_D(None, MockField('D'), column)
+    assert dates[0] == np.datetime64('1970-01-01')
+    assert np.isnat(dates[1])
+    assert np.isnat(dates[2])
+
+    with raises(ValueError):
+        _convert_D(None, MockField('D'),
+                   np.frombuffer(b'NotIntgr', dtype='u1').reshape(-1, 8))
+
+    # Days past the end of the month are not rolled over.
+    for data in [b'20200230', b'20190229', b'20200431', b'00000101']:
+        with raises(ValueError):
+            _convert_D(None, MockField('D'),
+                       np.frombuffer(data, dtype='u1').reshape(-1, 8))
+
+    dates = _convert_D(None, MockField('D'),
+                       np.frombuffer(b'20200229', dtype='u1').reshape(-1, 8))
+    assert dates[0] == np.datetime64('2020-02-29')
+
+def test_N():
+    column = np.array([b'1', b'-99', b'3.14', b'0.01**', b'', b'******'])
+    values = _convert_N(None, MockField('N', decimal_count=2), column)
+    assert list(values[:4]) == [1, -99, 3.14, 0.01]
+    assert np.isnan(values[4]) and np.isnan(values[5])
+
+    column = np.array([b' 1', b'-99'])
+    values = _convert_N(None, MockField('N', decimal_count=0), column)
+    assert values.dtype == np.int64
+
+def test_T():
+    parse = FieldParser(MockDBF()).parseT
+    data = b'\x8b\x87\x25\x00\x40\x42\x0f\x00'
+    column = np.frombuffer(data, dtype=[('day', '<u4'), ('msec', '<u4')])
+    value = _convert_T(None, MockField('T'), column)[0]
+    assert value.astype(datetime.datetime) == parse(MockField('T'), data)
+
+    data = b' ' * 8
+    assert parse(MockField('T'), data) is None
+    column = np.frombuffer(data, dtype=[('day', '<u4'), ('msec', '<u4')])
+    assert np.isnat(_convert_T(None, MockField('T'), column)[0])
+
+def test_L():
+    column = np.frombuffer(b'TyFn? ', dtype='u1')
+    values = _convert_L(None, MockField('L'), column)
+    assert list(values.filled(False)) == [True, True, False, False,
+                                          False, False]
+    assert list(values.mask) == [False] * 4 + [True] * 2
+
+    with raises(ValueError):
+        _convert_L(None, MockField('L'), np.frombuffer(b'!', dtype='u1'))
+
+def make_deleted_first_table():
+    fields = [('C', 'C', 3, 0), ('N', 'N', 4, 0), ('F', 'F', 6, 2)]
+    records = [b'abc' b'   1' b'  1.50',
+               b'def' b'  22' b'  2.25']
+    return DBF.from_buffer(make_dbf(fields, records, deleted=[0]))
+
+def test_empty_chunks():
+    table = make_deleted_first_table()
+
+    arrays = table.where('C', eq='zz').to_numpy()
+    assert arrays['N'].dtype == np.int64 and len(arrays['N']) == 0
+    assert arrays['F'].dtype == np.float64 and len(arrays['F']) == 0
+
+    # The first chunk has only a deleted record.
+    chunks = list(iter_numpy(table, chunksize=1))
+    assert [len(chunk['N']) for chunk in chunks] == [0, 1]
+    assert list(chunks[1]['F']) == [2.25]
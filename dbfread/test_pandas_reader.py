@@ -0,0 +1,29 @@
+from pytest import importorskip
+from .dbf import DBF
+
+pd = importorskip('pandas')
+
+def test_dataframe():
+    frame = DBF('testcases/memotest.dbf').DataFrame()
+    assert list(frame.columns) == ['NAME', 'BIRTHDATE', 'MEMO']
+    assert list(frame['NAME']) == [u'Alice', u'Bob']
+    assert list(frame['BIRTHDATE']) == [pd.Timestamp(1987, 3, 1),
+                                        pd.Timestamp(1980, 11, 12)]
+    assert list(frame['MEMO']) == [u'Alice memo', u'Bob memo']
+
+def test_dataframe_options():
+    table = DBF('testcases/memotest.dbf')
+
+    frame = table.DataFrame(columns=['NAME'], categorical=['NAME'])
+    assert list(frame.columns) == ['NAME']
+    assert frame['NAME'].dtype == 'category'
+
+    frame = table.DataFrame(dtype={'NAME': 'category'})
+    assert frame['NAME'].dtype == 'category'
+
+def test_dataframe_chunksize():
+    table = DBF('testcases/memotest.dbf')
+    frames = list(table.DataFrame(chunksize=1))
+    # The last record is deleted so there are only two frames.
+    assert [list(frame.index) for frame in frames] == [[0], [1]]
+    assert list(pd.concat(frames)['NAME']) == [u'Alice', u'Bob']
@@ -0,0 +1,32 @@
+import pickle
+from .dbf import DBF
+
+def get_name(record):
+    return record['NAME']
+
+def test_handle():
+    table = DBF('testcases/memotest.dbf', columns=['NAME', 'MEMO'])
+    handle = pickle.loads(pickle.dumps(table.get_handle()))
+
+    copy = handle.open()
+    assert copy.fields[0].name == table.fields[0].name
+    assert copy.memofilename == table.memofilename
+    assert list(copy) == list(table)
+    assert list(handle.iter_records(deleted=True)) == list(table.deleted)
+
+def test_handle_split():
+    handle = DBF('testcases/memotest.dbf').get_handle()
+    ranges = [(part.start, part.stop) for part in handle.split(2)]
+    assert ranges == [(0, 2), (2, None)]
+
+    names = [[record['NAME'] for record in part.iter_records()]
+             for part in handle.split(1)]
+    assert names == [[u'Alice'], [u'Bob'], []]
+
+def test_parallel_iter():
+    table = DBF('testcases/memotest.dbf')
+    assert list(table.parallel_iter(workers=2, chunksize=1)) == list(table)
+
+    names = table.parallel_map(get_name, workers=2, ordered=False,
+                               chunksize=1)
+    assert sorted(names) == [u'Alice', u'Bob']
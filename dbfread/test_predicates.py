@@ -0,0 +1,75 @@
+import struct
+import datetime
+from pytest import raises
+from .dbf import DBF
+from .test_read_and_length import make_dbf
+
+def names(records):
+    return [record['NAME'] for record in records]
+
+def test_where():
+    table = DBF('testcases/memotest.dbf')
+
+    assert names(table.where('NAME', eq='Bob')) == [u'Bob']
+    assert names(table.where('NAME', ne='Bob')) == [u'Alice']
+    assert names(table.where('NAME', isin=['Bob', 'Nobody'])) == [u'Bob']
+    assert names(table.where('NAME', eq='Deleted Guy').deleted) == [
+        u'Deleted Guy']
+
+    before_1985 = table.where('BIRTHDATE', lt=datetime.date(1985, 1, 1))
+    assert names(before_1985) == [u'Bob']
+    assert len(before_1985) == 1
+    assert len(before_1985.deleted) == 1
+
+    # Filters are combined.
+    assert names(before_1985.where('NAME', eq='Alice')) == []
+
+def test_where_random_access():
+    table = DBF('testcases/memotest.dbf').where('NAME', eq='Bob')
+    assert names(table.records[:]) == [u'Bob']
+    with raises(IndexError):
+        table.records[0]
+
+def test_where_errors():
+    table = DBF('testcases/memotest.dbf')
+    with raises(ValueError):
+        table.where('NOSUCHFIELD', eq=1)
+    with raises(ValueError):
+        table.where('NAME', like='B%')
+    with raises(ValueError):
+        # Memos are not in the record.
+        table.where('MEMO', eq='Bob memo')
+
+def make_numbers_table():
+    fields = [('NAME', 'C', 5, 0),
+              ('N', 'N', 6, 0),
+              ('F', 'F', 8, 2),
+              ('I', 'I', 4, 0),
+              ('AUTO', '+', 4, 0)]
+    rows = [(b'one  ', b'     1', b'    1.50', 1, 10),
+            (b'two  ', b'    20', b'**-2.25*', -2, 20),
+            (b'three', b'  300*', b' 3.75   ', 300, 30),
+            (b'empty', b'      ', b'        ', 0, 40)]
+    records = [name + n + f + struct.pack('<ii', i, auto)
+               for (name, n, f, i, auto) in rows]
+    return DBF.from_buffer(make_dbf(fields, records))
+
+def test_where_numbers():
+    table = make_numbers_table()
+
+    # N and F: padding with spaces and * and empty values.
+    assert names(table.where('N', eq=20)) == [u'two']
+    assert names(table.where('N', ge=20, lt=300)) == [u'two']
+    assert names(table.where('N', gt=1)) == [u'two', u'three']
+    assert names(table.where('N', isin=[1, 300])) == [u'one', u'three']
+    assert names(table.where('N', eq=None)) == [u'empty']
+    assert names(table.where('F', lt=0)) == [u'two']
+    assert names(table.where('F', ge=1.5)) == [u'one', u'three']
+    assert names(table.where('F', isin=[3.75, -2.25])) == [u'two', u'three']
+
+    # I and +: unpacked from the record.
+    assert names(table.where('I', lt=0)) == [u'two']
+    assert names(table.where('I', ge=0, le=1)) == [u'one', u'empty']
+    assert names(table.where('I', isin=[300, -2])) == [u'two', u'three']
+    assert names(table.where('AUTO', gt=10, lt=40)) == [u'two', u'three']
+    assert names(table.where('AUTO', isin=[10, 40])) == [u'one', u'empty']
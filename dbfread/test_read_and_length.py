@@ -2,8 +2,29 @@
 Tests reading from database.
 """
 from pytest import fixture
+import struct
 import datetime
 from .dbf import DBF
+from .mmapfile import BufferFile
+
+def make_dbf(fields, records, deleted=()):
+    """Return a dBase III table as bytes.
+
+    fields is a list of (name, type, length, decimal_count) and
+    records a list of raw records without the deletion flag. deleted
+    is the indexes of the records that are marked as deleted.
+    """
+    headerlen = 32 + 32 * len(fields) + 1
+    recordlen = 1 + sum(field[2] for field in fields)
+    data = struct.pack('<BBBBLHH20x', 0x03, 120, 1, 1,
+                       len(records), headerlen, recordlen)
+    for name, type, length, decimal_count in fields:
+        data += struct.pack('<11sc4xBB14x', name.encode('ascii'),
+                            type.encode('ascii'), length, decimal_count)
+    data += b'\r'
+    for i, record in enumerate(records):
+        data += (b'*' if i in deleted else b' ') + record
+    return data + b'\x1a'
 
 @fixture
 def table():
@@ -40,3 +61,152 @@ def test_list():
 
     # This should not return old style table which was a subclass of list.
     assert not isinstance(table(), list)
+
+def test_small_buffer_size():
+    # Blocks smaller than a record should be rounded up to one record.
+    for buffer_size in [1, 29, 30, 58, 1000]:
+        table = DBF('testcases/memotest.dbf', buffer_size=buffer_size)
+        assert list(table) == records
+        assert list(table.deleted) == deleted_records
+        assert len(table) == 2
+        assert len(table.deleted) == 1
+
+def test_mmap():
+    table = DBF('testcases/memotest.dbf', mmap=True)
+    assert list(table) == records
+    assert list(table.deleted) == deleted_records
+    assert len(table) == 2
+    assert len(table.deleted) == 1
+
+def test_random_access():
+    from pytest import raises
+    table = DBF('testcases/memotest.dbf')
+
+    # Indexes are positions in the file. The deleted record is last.
+    assert table.records[0] == records[0]
+    assert table.records[-2] == records[1]
+    assert table.deleted[2] == deleted_records[0]
+    assert table.get_record(2) == deleted_records[0]
+
+    assert table.records[:] == records
+    assert table.records[::-1] == records[::-1]
+    assert table.deleted[:] == deleted_records
+
+    with raises(IndexError):
+        table.records[2]
+    with raises(IndexError):
+        table.deleted[0]
+    with raises(IndexError):
+        table.get_record(3)
+
+    assert [recno for (recno, _) in table.records.iter_recno()] == [1, 2]
+    assert [recno for (recno, _) in table.deleted.iter_recno()] == [3]
+
+def test_count_cache(tmpdir):
+    import os
+    import shutil
+    for name in ['memotest.dbf', 'memotest.FPT']:
+        shutil.copy(os.path.join('testcases', name), str(tmpdir))
+    filename = str(tmpdir.join('memotest.dbf'))
+
+    table = DBF(filename)
+    assert len(table) == 2
+    assert len(table.deleted) == 1
+
+    # Delete the first record. The counts should follow the file.
+    with open(filename, 'r+b') as outfile:
+        outfile.seek(table.header.headerlen)
+        outfile.write(b'*')
+    os.utime(filename, (0, 0))
+
+    assert len(table) == 1
+    assert len(table.deleted) == 2
+
+def test_columns():
+    from pytest import raises
+    table = DBF('testcases/memotest.dbf', columns=['MEMO', 'NAME'])
+    assert [list(record.items()) for record in table] == [
+        [(u'MEMO', u'Alice memo'), (u'NAME', u'Alice')],
+        [(u'MEMO', u'Bob memo'), (u'NAME', u'Bob')]]
+
+    table = DBF('testcases/memotest.dbf').select('BIRTHDATE')
+    assert list(table.deleted) == [
+        {u'BIRTHDATE': deleted_records[0]['BIRTHDATE']}]
+
+    with raises(ValueError):
+        DBF('testcases/memotest.dbf', columns=['NOSUCHFIELD'])
+
+def test_from_buffer():
+    with open('testcases/memotest.dbf', 'rb') as infile:
+        data = infile.read()
+    with open('testcases/memotest.FPT', 'rb') as infile:
+        memo = infile.read()
+    expected = DBF('testcases/memotest.dbf')
+
+    # Step slices are used to read the deletion flags.
+    assert BufferFile(b'abcdef')[1:6:2] == b'bdf'
+    assert BufferFile(b'abcdef')[::-2] == b'fdb'
+
+    table = DBF.from_buffer(bytearray(data), memo=memoryview(memo))
+    assert table.filename is None
+    assert len(table) == len(expected)
+    assert list(table) == list(expected)
+    assert table.records[1] == expected.records[1]
+
+def test_compact_records():
+    import pickle
+    expected = list(DBF('testcases/memotest.dbf'))
+    names = list(expected[0].keys())
+
+    table = DBF('testcases/memotest.dbf', recfactory='tuple')
+    assert table.record_names == names
+    assert list(table) == [tuple(record.values()) for record in expected]
+
+    table = DBF('testcases/memotest.dbf', recfactory='namedtuple',
+                columns=['NAME', 'MEMO'])
+    record = table.records[0]
+    assert record.NAME == expected[0]['NAME']
+    assert record._fields == ('NAME', 'MEMO')
+    assert pickle.loads(pickle.dumps(record)) == record
+
+    table = DBF('testcases/memotest.dbf', recfactory='slots')
+    records = list(table)
+    assert records == expected
+    assert records[0].NAME == records[0]['NAME'] == expected[0]['NAME']
+    assert not hasattr(records[0], '__dict__')
+    assert pickle.loads(pickle.dumps(records[1])) == expected[1]
+
+def test_iter_all():
+    table = DBF('testcases/memotest.dbf')
+    assert list(table.iter_all()) == [(1, False, records[0]),
+                                      (2, False, records[1]),
+                                      (3, True, deleted_records[0])]
+
+    table.load()
+    assert table.records == records
+    assert table.deleted == deleted_records
+    assert [recno for recno, _, _ in table.iter_all()] == [1, 2, 3]
+
+def test_compact_records_keyword_names():
+    from .records import make_record_class
+    names = ['class', 'from', 'NAME']
+
+    record = make_record_class('namedtuple', names)(1, 2, 3)
+    assert record._fields == ('_0', '_1', 'NAME')
+    assert (record._0, record._1, record.NAME) == (1, 2, 3)
+
+    record = make_record_class('slots', names)(1, 2, 3)
+    assert (record._0, record._1, record.NAME) == (1, 2, 3)
+    assert record['class'] == 1
+
+def test_slots_records_method_names():
+    from .records import make_record_class
+    names = ['items', 'get', 'keys', 'values', 'NAME']
+
+    record = make_record_class('slots', names)(1, 2, 3, 4, 5)
+    assert (record._0, record._1, record._2, record._3) == (1, 2, 3, 4)
+    assert record.keys() == names
+    assert record.values() == [1, 2, 3, 4, 5]
+    assert record.items() == list(zip(names, [1, 2, 3, 4, 5]))
+    assert record.get('get') == 2
+    assert record['items'] == 1
@@ -0,0 +1,80 @@
+import io
+import gzip
+import shutil
+from pytest import raises
+from .dbf import DBF
+from .exceptions import NotSeekable
+
+def compress(tmpdir, name):
+    path = str(tmpdir.join(name + '.gz'))
+    with open('testcases/' + name, 'rb') as infile:
+        with gzip.open(path, 'wb') as outfile:
+            shutil.copyfileobj(infile, outfile)
+    return path
+
+def test_compressed(tmpdir):
+    path = compress(tmpdir, 'memotest.dbf')
+    compress(tmpdir, 'memotest.FPT')
+    expected = DBF('testcases/memotest.dbf')
+
+    table = DBF(path)
+    assert table.compression == 'gzip'
+    assert not table.seekable
+    assert table.name == 'memotest'
+    assert list(table) == list(expected)
+    assert list(table.deleted) == list(expected.deleted)
+
+    with raises(NotSeekable):
+        len(table)
+
+    with raises(NotSeekable):
+        table.records[0]
+
+class Pipe(object):
+    # A file object that can't seek and returns short reads.
+    def __init__(self, data):
+        self._data = io.BytesIO(data)
+
+    def read(self, size=-1):
+        if size is not None and size > 1:
+            size //= 2
+        return self._data.read(size)
+
+def test_file_object():
+    with open('testcases/memotest.dbf', 'rb') as infile:
+        data = infile.read()
+    expected = DBF('testcases/memotest.dbf')
+
+    table = DBF(Pipe(data), ignore_missing_memofile=True, buffer_size=1)
+    assert table.filename is None
+    names = [record['NAME'] for record in table]
+    assert names == [record['NAME'] for record in expected]
+
+    # The stream has been read.
+    with raises(NotSeekable):
+        list(table)
+
+    table = DBF(Pipe(data), ignore_missing_memofile=True, load=True)
+    assert len(table) == len(expected)
+    assert len(table.deleted) == len(expected.deleted)
+
+def test_seekable_file_object():
+    with open('testcases/memotest.dbf', 'rb') as infile:
+        data = infile.read()
+    expected = DBF('testcases/memotest.dbf')
+
+    with open('testcases/memotest.dbf', 'rb') as infile:
+        table = DBF(infile)
+        assert table.seekable
+        assert len(table) == 2
+        assert list(table) == list(expected)
+        assert list(table) == list(expected)
+        assert table.records[1] == expected.records[1]
+
+    # The table can start in the middle of the file object.
+    fileobj = io.BytesIO(b'junk' + data)
+    fileobj.seek(4)
+    table = DBF(fileobj, ignore_missing_memofile=True)
+    assert len(table) == 2
+    assert len(table.deleted) == 1
+    assert [record['NAME'] for record in table] == [u'Alice', u'Bob']
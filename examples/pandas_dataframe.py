@@ -1,13 +1,9 @@
 """
 Load content of a DBF file into a Pandas data frame.
-
-The iter() is required because Pandas doesn't detect that the DBF
-object is iterable.
 """
 from dbfread import DBF
-from pandas import DataFrame
 
 dbf = DBF('files/people.dbf')
-frame = DataFrame(iter(dbf))
+frame = dbf.DataFrame()
 
 print(frame)
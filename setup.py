@@ -34,6 +34,11 @@ setup(
     include_package_data=True,
     zip_safe=True,
     install_requires=[],
+    extras_require={
+        'numpy': ['numpy'],
+        'pandas': ['pandas'],
+        'arrow': ['pyarrow'],
+    },
     license='MIT',
     classifiers=(
         'Development Status :: 5 - Production/Stable',